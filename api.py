@@ -0,0 +1,346 @@
+"""Headless HTTP/JSON API for the ranking engine.
+
+A small asyncio HTTP/1.1 server (keep-alive, no dependencies) around the same
+``ranking`` functions the Streamlit app uses. Sessions live in an in-process
+store; ``MemoryCache`` stands in for an external cache such as Redis.
+
+Routes:
+    POST /sessions                      start a session -> session view
+    GET  /sessions/<id>                 next pair (or song to place in a tier)
+    POST /sessions/<id>/answer          {"picked_left": bool} or {"tier": "S"}
+    POST /sessions/<id>/skip            skip the current song
+    POST /sessions/<id>/undo            undo the last answer
+    POST /sessions/<id>/tiers/<t>/open  start sorting a tier (tier mode)
+    POST /sessions/<id>/tiers/close     pause sorting the open tier
+    GET  /sessions/<id>/ranking         ranked songs with Beli scores
+    GET  /sessions/<id>/share           share code for the ranking
+    POST /share/decode                  {"code": ...} -> shared ranking
+    GET  /health
+
+POST /sessions accepts ``name``, ``pool_size`` (int, omit for all songs),
+``include_covers``, ``filters`` (see ``pool_index.select_pool``), ``mode``
+(``full``, ``topk`` or ``tiers``) and ``top_k``.
+
+Usage:
+    python api.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import secrets
+import time
+from urllib.parse import urlsplit
+
+import ranking
+from catalog import load_catalog
+from pool_index import SongIndex, select_pool
+
+HISTORY_LIMIT = 20
+SESSION_TTL = 6 * 60 * 60
+MAX_BODY = 64 * 1024
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large'}
+
+
+class APIError(Exception):
+    """Error returned to the client as ``{"error": message}``"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MemoryCache:
+    """In-process stand-in for an external key/value cache with expiry"""
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value, ttl: float = None):
+        expires = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def sweep(self) -> int:
+        """Drop expired keys; returns how many were removed"""
+        now = time.monotonic()
+        expired = [k for k, (_, expires) in self._data.items() if expires is not None and expires < now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SessionStore:
+    """Ranking sessions keyed by a random id, refreshed on every access"""
+
+    def __init__(self, cache: MemoryCache, ttl: float = SESSION_TTL):
+        self.cache = cache
+        self.ttl = ttl
+
+    def create(self, name: str, state: dict) -> str:
+        session_id = secrets.token_urlsafe(12)
+        self.save(session_id, {'name': name, 'state': state, 'history': []})
+        return session_id
+
+    def get(self, session_id: str) -> dict:
+        session = self.cache.get('session:' + session_id)
+        if session is None:
+            raise APIError(404, "unknown or expired session")
+        return session
+
+    def save(self, session_id: str, session: dict):
+        self.cache.set('session:' + session_id, session, self.ttl)
+
+
+class RankingAPI:
+    """Routes JSON requests to the ranking engine"""
+
+    def __init__(self, songs: list, store: SessionStore):
+        self.songs = songs
+        self.index = SongIndex(songs)
+        self.store = store
+
+    def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        """Handle one request; returns ``(status, payload)``"""
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {'error': "body is not valid JSON"}
+        if not isinstance(payload, dict):
+            return 400, {'error': "body must be a JSON object"}
+
+        parts = [p for p in path.split('/') if p]
+        try:
+            if parts == ['health']:
+                return 200, {'ok': True, 'sessions': len(self.store.cache)}
+            if parts == ['sessions']:
+                self._require(method, 'POST')
+                return 201, self.start_session(payload)
+            if parts == ['share', 'decode']:
+                self._require(method, 'POST')
+                return 200, self.decode_share(payload)
+            if len(parts) >= 2 and parts[0] == 'sessions':
+                return 200, self.session_action(method, parts[1], parts[2:], payload)
+            raise APIError(404, "no such route")
+        except APIError as e:
+            return e.status, {'error': e.message}
+
+    @staticmethod
+    def _require(method: str, expected: str):
+        if method != expected:
+            raise APIError(405, f"use {expected}")
+
+    def start_session(self, payload: dict) -> dict:
+        name = str(payload.get('name') or 'Anonymous')[:100]
+        mode = payload.get('mode', 'full')
+        if mode not in ('full', 'topk', 'tiers'):
+            raise APIError(400, "mode must be full, topk or tiers")
+        pool_size = payload.get('pool_size')
+        top_k = payload.get('top_k', 10)
+        if pool_size is not None and (not isinstance(pool_size, int) or pool_size < 2):
+            raise APIError(400, "pool_size must be an integer >= 2")
+        if mode == 'topk' and (not isinstance(top_k, int) or top_k < 1):
+            raise APIError(400, "top_k must be a positive integer")
+        filters = payload.get('filters') or {}
+        if not isinstance(filters, dict):
+            raise APIError(400, "filters must be an object")
+
+        try:
+            pool = select_pool(self.index, filters, include_covers=bool(payload.get('include_covers', True)),
+                               limit=pool_size)
+        except (TypeError, ValueError):
+            raise APIError(400, "invalid filters")
+        if len(pool) < 2:
+            raise APIError(400, "pool has fewer than two songs")
+
+        state = ranking.new_state(pool, mode, top_k if mode == 'topk' else None)
+        session_id = self.store.create(name, state)
+        return self.view(session_id, self.store.get(session_id))
+
+    def session_action(self, method: str, session_id: str, action: list, payload: dict) -> dict:
+        session = self.store.get(session_id)
+        state = session['state']
+
+        if not action:
+            self._require(method, 'GET')
+        elif action == ['ranking']:
+            self._require(method, 'GET')
+            return self.ranking(session)
+        elif action == ['share']:
+            self._require(method, 'GET')
+            return {'code': ranking.encode_rankings(session['name'], state['ranked_songs'])}
+        elif action == ['answer']:
+            self._require(method, 'POST')
+            session['state'] = self._answer(state, payload)
+            session['history'] = (session['history'] + [state])[-HISTORY_LIMIT:]
+        elif action == ['skip']:
+            self._require(method, 'POST')
+            session['state'] = ranking.skip_song(state)
+        elif action == ['undo']:
+            self._require(method, 'POST')
+            if not session['history']:
+                raise APIError(409, "nothing to undo")
+            session['state'] = session['history'].pop()
+        elif len(action) == 3 and action[0] == 'tiers' and action[2] == 'open':
+            self._require(method, 'POST')
+            if state['ranking_mode'] != 'tiers' or action[1] not in ranking.TIERS:
+                raise APIError(400, "not a tier-list session or unknown tier")
+            session['state'] = ranking.open_tier(state, action[1])
+        elif action == ['tiers', 'close']:
+            self._require(method, 'POST')
+            if state['ranking_mode'] != 'tiers':
+                raise APIError(400, "not a tier-list session")
+            session['state'] = ranking.close_tier(state)
+        else:
+            raise APIError(404, "no such route")
+
+        self.store.save(session_id, session)
+        return self.view(session_id, session)
+
+    @staticmethod
+    def _answer(state: dict, payload: dict) -> dict:
+        if 'tier' in payload:
+            if state['ranking_mode'] != 'tiers' or state['active_tier'] or not state['current_song']:
+                raise APIError(409, "no song is waiting for a tier")
+            if payload['tier'] not in ranking.TIERS:
+                raise APIError(400, f"tier must be one of {', '.join(ranking.TIERS)}")
+            return ranking.assign_tier(state, payload['tier'])
+        if not isinstance(payload.get('picked_left'), bool):
+            raise APIError(400, "send {\"picked_left\": true|false} or {\"tier\": ...}")
+        if ranking.current_pair(state) is None:
+            raise APIError(409, "no comparison is pending")
+        return ranking.answer(state, payload['picked_left'])
+
+    @staticmethod
+    def view(session_id: str, session: dict) -> dict:
+        state = session['state']
+        pair = ranking.current_pair(state)
+        place = None
+        if state['ranking_mode'] == 'tiers' and not state['active_tier']:
+            place = state['current_song']
+        return {
+            'session_id': session_id,
+            'name': session['name'],
+            'mode': state['ranking_mode'],
+            'pair': list(pair) if pair else None,
+            'place': place,
+            'active_tier': state['active_tier'],
+            'ranked': len(state['ranked_songs']),
+            'remaining': len(state['unranked_songs']),
+            'comparisons': state['total_comparisons'],
+            'can_undo': bool(session['history']),
+            'done': pair is None and place is None,
+        }
+
+    @staticmethod
+    def ranking(session: dict) -> dict:
+        state = session['state']
+        if state['ranking_mode'] == 'tiers':
+            rows = [{'song': song, 'tier': tier, 'score': score}
+                    for song, tier, score in ranking.tier_scores(state)]
+        else:
+            total = len(state['ranked_songs'])
+            rows = [{'song': song, 'score': ranking.get_beli_score(i, total)}
+                    for i, song in enumerate(state['ranked_songs'], 1)]
+        return {'name': session['name'], 'ranking': rows}
+
+    def decode_share(self, payload: dict) -> dict:
+        name, rankings = ranking.decode_rankings(str(payload.get('code', '')), self.songs)
+        if rankings is None:
+            raise APIError(400, "invalid share code")
+        return {'name': name, 'ranking': rankings}
+
+
+async def serve_client(api: RankingAPI, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve HTTP/1.1 requests on one connection until it closes"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY:
+                status, payload = 413, {'error': "body too large"}
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length) if length else b''
+                status, payload = api.dispatch(method, urlsplit(target).path, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+            data = json.dumps(payload, separators=(',', ':')).encode()
+            head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n")
+            if not keep_alive:
+                head += "Connection: close\r\n"
+            writer.write(head.encode() + b"\r\n" + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def sweep_sessions(cache: MemoryCache, interval: float = 60):
+    """Periodically drop expired sessions"""
+    while True:
+        await asyncio.sleep(interval)
+        cache.sweep()
+
+
+async def run_server(host: str, port: int, catalog_path: str = 'goose_songs.json'):
+    api = RankingAPI(load_catalog(catalog_path), SessionStore(MemoryCache()))
+    server = await asyncio.start_server(
+        lambda r, w: serve_client(api, r, w), host, port, backlog=4096
+    )
+    sweeper = asyncio.create_task(sweep_sessions(api.store.cache))
+    print(f"Goose Ranker API listening on http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless HTTP/JSON API for Goose Ranker")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--catalog', default='goose_songs.json')
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port, args.catalog))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
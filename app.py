@@ -1,15 +1,14 @@
 import streamlit as st
-import json
-import base64
-from datetime import datetime
-
-# Page config
-st.set_page_config(
-    page_title="Goose Song Ranker",
-    page_icon="🪿",
-    layout="centered",
-    initial_sidebar_state="collapsed"
-)
+
+import catalog
+import checkpoint
+import ranking
+import rooms
+from pool_index import SongIndex, select_mask, select_pool
+from ranking import decode_rankings, encode_rankings, get_beli_score
+
+# How often every member's page checks the room for a new pair
+ROOM_POLL_SECONDS = 1
 
 # Preset options for song pool size
 POOL_PRESETS = {
@@ -23,7 +22,7 @@ POOL_PRESETS = {
 }
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;700&family=JetBrains+Mono:wght@400;500&display=swap');
     
@@ -236,29 +235,30 @@ st.markdown("""
         word-break: break-all;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+def setup_page():
+    """Page config and styles - runs first in main(), not at import"""
+    st.set_page_config(
+        page_title="Goose Song Ranker",
+        page_icon="🪿",
+        layout="centered",
+        initial_sidebar_state="collapsed"
+    )
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 @st.cache_data
 def load_songs():
-    """Load and process songs - combine side_project into original"""
-    with open('goose_songs.json', 'r') as f:
-        data = json.load(f)
-    
-    songs = data['songs']
-    # Combine side_project into original
-    for song in songs:
-        if song['category'] == 'side_project':
-            song['category'] = 'original'
-    
-    return songs
+    """Full song list - only needed to decode shared rankings"""
+    return catalog.load_catalog('goose_songs.json')
 
 
-def get_beli_score(position: int, total: int) -> float:
-    """Calculate Beli-style score (0-10) based on position"""
-    if total <= 1:
-        return 10.0
-    return round(10 - ((position - 1) / (total - 1)) * 10, 1)
+@st.cache_resource
+def load_song_index() -> SongIndex:
+    """Bitmap index over the catalog, built once per process from goose_songs.bin if fresh"""
+    return catalog.load_song_index('goose_songs.json')
 
 
 def init_session_state():
@@ -268,6 +268,7 @@ def init_session_state():
         'pool_size': 'Top 50',
         'custom_pool_size': '',
         'include_covers': True,
+        'pool_filters': {},
         'setup_complete': False,
         'ranked_songs': [],
         'unranked_songs': [],
@@ -283,53 +284,130 @@ def init_session_state():
         'song_b': None,
         # Undo functionality
         'action_history': [],
+        # Ranking mode - full binary insertion, "Find my Top K" or tier list
+        'ranking_mode': 'full',
+        'top_k': 10,
+        'tournament': None,
+        'tiers': None,
+        'active_tier': None,
+        # Speculative next-pair precomputation
+        'state_version': 0,
+        'next_states': None,
+        'pair_html': None,
+        # Resume-anywhere checkpoint in the URL
+        'save_progress_in_url': True,
+        'checkpoint': None,
+        # Group room this session has joined
+        'room_code': None,
+        'room_member': None,
+        'room_voted_round': None,
+        'room_notice': None,
     }
     for key, val in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = val
 
 
-def get_filtered_pool(songs: list) -> list:
+def get_filtered_pool(index: SongIndex) -> list:
     """Get song pool based on settings"""
-    pool = songs.copy()
-
-    if not st.session_state.include_covers:
-        pool = [s for s in pool if s['category'] != 'cover']
-
-    pool.sort(key=lambda x: x.get('times_played', 0), reverse=True)
-
     limit = POOL_PRESETS.get(st.session_state.pool_size)
     if limit == -1:  # Custom option selected
         limit = st.session_state.custom_pool_size
-    if limit:
-        pool = pool[:limit]
+    return select_pool(
+        index,
+        st.session_state.pool_filters,
+        include_covers=st.session_state.include_covers,
+        limit=limit or None,
+    )
+
+
+@st.cache_resource
+def get_precompute_executor():
+    """Shared worker pool for speculative next-pair precomputation"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="goose-precompute")
+
+
+def render_song_card(song: dict) -> str:
+    """Render the HTML for one comparison card"""
+    plays = f"Played {song.get('times_played', '?')}x"
+    if song.get('last_played'):
+        plays += f" • last {song['last_played']}"
+    return f"""
+                <div class="tinder-card" style="min-height: 200px;">
+                    <div class="song-title" style="font-size: 1.5rem;">{song['name']}</div>
+                    <div class="song-artist">{song['artist']}</div>
+                    <div class="song-plays">{plays}</div>
+                </div>
+                """
+
+
+def render_pair(pair: tuple) -> tuple:
+    """Render the HTML for both cards of a (left, right) pair"""
+    return render_song_card(pair[0]), render_song_card(pair[1])
 
-    return pool
+
+def apply_ranking_state(state: dict, pair_html: tuple = None):
+    """Write an engine state back into the session and drop stale precomputes"""
+    for key in ranking.STATE_KEYS:
+        st.session_state[key] = state[key]
+    st.session_state.state_version += 1
+    st.session_state.next_states = None
+    st.session_state.pair_html = pair_html
+
+
+def schedule_precompute():
+    """Start computing both possible next states in the background"""
+    if st.session_state.next_states is not None:
+        return
+    state = ranking.snapshot(st.session_state)
+    future = get_precompute_executor().submit(ranking.precompute_next_states, state, render_pair)
+    st.session_state.next_states = (st.session_state.state_version, future)
+
+
+def get_pair_html(pair: tuple) -> tuple:
+    """Card HTML for the pair on screen, reusing the precomputed render if any"""
+    if st.session_state.pair_html is None:
+        st.session_state.pair_html = render_pair(pair)
+    return st.session_state.pair_html
+
+
+def sync_checkpoint():
+    """Write the current checkpoint code to the URL (if enabled)"""
+    if st.session_state.checkpoint is not None:
+        st.query_params['c'] = st.session_state.checkpoint.encode()
+
+
+def resume_from_checkpoint(code: str, index: SongIndex) -> bool:
+    """Restore a session from a checkpoint code; False if it can't be used"""
+    try:
+        saved = checkpoint.decode_checkpoint(code, index)
+        state = checkpoint.replay(saved, index)
+    except ValueError:
+        return False
+    st.session_state.user_name = saved.name
+    st.session_state.setup_complete = True
+    st.session_state.checkpoint = saved
+    st.session_state.action_history = []
+    apply_ranking_state(state)
+    return True
 
 
 def setup_initial_matchup():
-    """Set up the first head-to-head matchup"""
-    if len(st.session_state.unranked_songs) >= 2:
-        st.session_state.song_a = st.session_state.unranked_songs[0]
-        st.session_state.song_b = st.session_state.unranked_songs[1]
-        st.session_state.initial_matchup = True
+    """Set up the first head-to-head matchup (or first tournament match)"""
+    apply_ranking_state(ranking.new_state(
+        st.session_state.unranked_songs,
+        mode=st.session_state.ranking_mode,
+        top_k=st.session_state.top_k,
+    ))
 
 
 def save_state_to_history():
     """Save current state to history for undo"""
-    state_snapshot = {
-        'ranked_songs': st.session_state.ranked_songs.copy(),
-        'unranked_songs': st.session_state.unranked_songs.copy(),
-        'current_song': st.session_state.current_song,
-        'comparison_left': st.session_state.comparison_left,
-        'comparison_right': st.session_state.comparison_right,
-        'ranking_in_progress': st.session_state.ranking_in_progress,
-        'total_comparisons': st.session_state.total_comparisons,
-        'songs_ranked_count': st.session_state.songs_ranked_count,
-        'initial_matchup': st.session_state.initial_matchup,
-        'song_a': st.session_state.song_a,
-        'song_b': st.session_state.song_b,
-    }
+    state_snapshot = ranking.snapshot(st.session_state)
+    if st.session_state.checkpoint is not None:
+        state_snapshot['checkpoint_bits'] = st.session_state.checkpoint.nbits
     st.session_state.action_history.append(state_snapshot)
     # Keep history limited to last 20 actions to avoid memory issues
     if len(st.session_state.action_history) > 20:
@@ -340,136 +418,243 @@ def undo_last_action():
     """Undo the last ranking action"""
     if st.session_state.action_history:
         previous_state = st.session_state.action_history.pop()
-        st.session_state.ranked_songs = previous_state['ranked_songs']
-        st.session_state.unranked_songs = previous_state['unranked_songs']
-        st.session_state.current_song = previous_state['current_song']
-        st.session_state.comparison_left = previous_state['comparison_left']
-        st.session_state.comparison_right = previous_state['comparison_right']
-        st.session_state.ranking_in_progress = previous_state['ranking_in_progress']
-        st.session_state.total_comparisons = previous_state['total_comparisons']
-        st.session_state.songs_ranked_count = previous_state['songs_ranked_count']
-        st.session_state.initial_matchup = previous_state['initial_matchup']
-        st.session_state.song_a = previous_state['song_a']
-        st.session_state.song_b = previous_state['song_b']
+        apply_ranking_state(previous_state)
+        if st.session_state.checkpoint is not None and 'checkpoint_bits' in previous_state:
+            st.session_state.checkpoint.truncate(previous_state['checkpoint_bits'])
+            sync_checkpoint()
 
 
-def process_initial_choice(chose_a: bool):
-    """Process the initial head-to-head choice"""
+def process_answer(picked_left: bool):
+    """Apply a pick, using the precomputed outcome when it is ready"""
     save_state_to_history()
 
-    st.session_state.total_comparisons += 1
-
-    if chose_a:
-        # A is better - A is #1, B is #2
-        st.session_state.ranked_songs = [st.session_state.song_a, st.session_state.song_b]
+    precomputed = st.session_state.next_states
+    future = precomputed[1] if precomputed and precomputed[0] == st.session_state.state_version else None
+    if future is not None and future.done() and future.exception() is None:
+        outcome = future.result()[picked_left]
+        apply_ranking_state(outcome['state'], outcome['html'])
     else:
-        # B is better - B is #1, A is #2
-        st.session_state.ranked_songs = [st.session_state.song_b, st.session_state.song_a]
+        # Never wait on the shared pool behind other sessions' work -
+        # answering inline takes microseconds
+        if future is not None:
+            future.cancel()
+        apply_ranking_state(ranking.answer(ranking.snapshot(st.session_state), picked_left))
 
-    # Remove both from unranked
-    st.session_state.unranked_songs.remove(st.session_state.song_a)
-    st.session_state.unranked_songs.remove(st.session_state.song_b)
+    if st.session_state.checkpoint is not None:
+        st.session_state.checkpoint.record_answer(picked_left)
+        sync_checkpoint()
 
-    # Clear initial matchup state
-    st.session_state.initial_matchup = False
-    st.session_state.song_a = None
-    st.session_state.song_b = None
-    st.session_state.songs_ranked_count = 2
 
-    # Auto-start next song if available
-    if st.session_state.unranked_songs:
-        start_ranking_song(st.session_state.unranked_songs[0])
+def process_initial_choice(chose_a: bool):
+    """Process the initial head-to-head choice"""
+    process_answer(picked_left=chose_a)
 
 
 def start_ranking_song(song: dict):
     """Start ranking a new song using binary search"""
-    st.session_state.current_song = song
-    st.session_state.ranking_in_progress = True
-    st.session_state.comparison_left = 0
-    st.session_state.comparison_right = len(st.session_state.ranked_songs) - 1
+    apply_ranking_state(ranking.start_ranking_song(ranking.snapshot(st.session_state), song))
 
 
 def skip_current_song():
     """Skip the current song and move it to the end of the unranked list"""
-    if st.session_state.current_song:
-        # Move current song to end of unranked list
-        st.session_state.unranked_songs.remove(st.session_state.current_song)
-        st.session_state.unranked_songs.append(st.session_state.current_song)
-        st.session_state.current_song = None
-        st.session_state.ranking_in_progress = False
+    if st.session_state.current_song and st.session_state.checkpoint is not None:
+        st.session_state.checkpoint.record_skip()
+        sync_checkpoint()
+    apply_ranking_state(ranking.skip_song(ranking.snapshot(st.session_state)))
+
 
-        # Auto-start next song if available
-        if st.session_state.unranked_songs:
-            start_ranking_song(st.session_state.unranked_songs[0])
+def pick_next_song(song: dict):
+    """Move a song to the front of the queue and start ranking it"""
+    if st.session_state.checkpoint is not None:
+        position = checkpoint.pool_position(st.session_state.checkpoint, load_song_index(), song)
+        st.session_state.checkpoint.record_pick(position)
+        sync_checkpoint()
+    apply_ranking_state(ranking.pick_song(ranking.snapshot(st.session_state), song))
 
 
 def process_swipe(is_better: bool):
     """Process swipe - True if current song is better than comparison"""
-    save_state_to_history()
+    # The song being ranked is always shown on the right
+    process_answer(picked_left=not is_better)
 
-    left = st.session_state.comparison_left
-    right = st.session_state.comparison_right
-    mid = (left + right) // 2
 
-    st.session_state.total_comparisons += 1
+def place_in_tier(tier: str):
+    """Place the current song into a tier"""
+    save_state_to_history()
+    if st.session_state.checkpoint is not None:
+        st.session_state.checkpoint.record_tier_command('assign', tier)
+        sync_checkpoint()
+    apply_ranking_state(ranking.assign_tier(ranking.snapshot(st.session_state), tier))
 
-    if is_better:
-        # Current song is better, search upper half (lower indices)
-        st.session_state.comparison_right = mid - 1
-    else:
-        # Comparison song is better, search lower half
-        st.session_state.comparison_left = mid + 1
 
-    # Check if search is complete
-    if st.session_state.comparison_left > st.session_state.comparison_right:
-        insert_pos = st.session_state.comparison_left
-        st.session_state.ranked_songs.insert(insert_pos, st.session_state.current_song)
-        st.session_state.unranked_songs.remove(st.session_state.current_song)
-        st.session_state.current_song = None
-        st.session_state.ranking_in_progress = False
-        st.session_state.songs_ranked_count += 1
+def open_tier(tier: str):
+    """Start or resume sorting the songs inside one tier"""
+    save_state_to_history()
+    if st.session_state.checkpoint is not None:
+        st.session_state.checkpoint.record_tier_command('open', tier)
+        sync_checkpoint()
+    apply_ranking_state(ranking.open_tier(ranking.snapshot(st.session_state), tier))
 
-        # Auto-start next song if available
-        if st.session_state.unranked_songs:
-            start_ranking_song(st.session_state.unranked_songs[0])
+
+def close_tier():
+    """Pause sorting the open tier"""
+    save_state_to_history()
+    if st.session_state.checkpoint is not None:
+        st.session_state.checkpoint.record_tier_command('close')
+        sync_checkpoint()
+    apply_ranking_state(ranking.close_tier(ranking.snapshot(st.session_state)))
 
 
 def get_comparison_song() -> dict:
     """Get current song to compare against"""
-    mid = (st.session_state.comparison_left + st.session_state.comparison_right) // 2
-    return st.session_state.ranked_songs[mid]
+    return ranking.comparison_song(st.session_state)
 
 
-def encode_rankings(name: str, rankings: list) -> str:
-    """Encode rankings to shareable string"""
-    data = {
-        'n': name,
-        'r': [s['name'] for s in rankings]
-    }
-    json_str = json.dumps(data, separators=(',', ':'))
-    return base64.urlsafe_b64encode(json_str.encode()).decode()
+@st.cache_resource
+def get_room_registry() -> rooms.RoomRegistry:
+    """Group rooms shared by every session in this process"""
+    return rooms.RoomRegistry()
+
+
+def get_room():
+    """The room this session is in, or None (never joined, or it expired)"""
+    if not st.session_state.room_code:
+        return None
+    room = get_room_registry().get(st.session_state.room_code)
+    if room is None or not room.touch(st.session_state.room_member):
+        st.session_state.room_code = None
+        st.session_state.room_member = None
+        return None
+    return room
 
 
-def decode_rankings(code: str, all_songs: list) -> tuple:
-    """Decode rankings from shared code"""
+def join_room(room: rooms.Room, name: str, weight: int = 1):
+    """Join a room and remember the membership in the session and URL"""
+    st.session_state.room_code = room.code
+    st.session_state.room_member = room.join(name, weight)
+    st.session_state.room_voted_round = None
+    st.query_params['room'] = room.code
+
+
+def leave_room(room: rooms.Room):
+    """Leave the room and forget it in the session and URL"""
+    room.leave(st.session_state.room_member)
+    st.session_state.room_code = None
+    st.session_state.room_member = None
+    st.session_state.room_voted_round = None
+    if 'room' in st.query_params:
+        del st.query_params['room']
+
+
+def cast_room_vote(room: rooms.Room, round_number: int, picked_left: bool):
+    """Vote on the room's pair; a vote for a round that already closed is dropped"""
     try:
-        json_str = base64.urlsafe_b64decode(code.encode()).decode()
-        data = json.loads(json_str)
-        name = data['n']
-        song_names = data['r']
-        
-        # Rebuild song objects
-        song_dict = {s['name']: s for s in all_songs}
-        rankings = [song_dict[n] for n in song_names if n in song_dict]
-        
-        return name, rankings
-    except:
-        return None, None
+        accepted = room.vote(st.session_state.room_member, round_number, picked_left)
+    except KeyError:
+        st.session_state.room_code = None
+        return
+    if accepted:
+        st.session_state.room_voted_round = round_number
+    else:
+        st.session_state.room_notice = "The room already moved on - here's the next pair."
+
+
+def render_room(room: rooms.Room):
+    """Shared pair, vote buttons and the room's ranking so far"""
+    member = st.session_state.room_member
+    room.maybe_sweep()
+    is_host = member == room.host
+    view = room.view
+
+    st.markdown(f"### 👥 {room.name}")
+    st.caption(f"Room code **{room.code}** (invite with `?room={room.code}`) • "
+               f"{len(room.members())} in the room • {room.voting} voting")
+
+    if st.session_state.room_notice:
+        st.info(st.session_state.room_notice)
+        st.session_state.room_notice = None
+    if view.last_result:
+        winner, loser, winner_votes, loser_votes = view.last_result
+        st.markdown(f"*Last round: **{winner}** beat {loser} ({winner_votes}-{loser_votes})*")
+
+    voted = st.session_state.room_voted_round == view.round
+    if view.done:
+        st.markdown("### 🎉 The room is done!")
+        code = encode_rankings(room.name, list(view.ranked))
+        st.code(f"?r={code}", language=None)
+        st.caption("Share this link suffix to show off the group's ranking")
+    else:
+        song_left, song_right = view.pair
+        # Rendered once per round for the whole room
+        html_left, html_right = room.rendered(view, lambda v: render_pair(v.pair))
+        cast, needed = room.progress()
+
+        st.markdown("### 🎯 Which song does the group prefer?")
+        st.progress(min(1.0, cast / needed), text=f"{cast} of {needed} votes needed")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(html_left, unsafe_allow_html=True)
+            if st.button(f"{song_left['name']}", use_container_width=True, key="room_left"):
+                cast_room_vote(room, view.round, True)
+                st.rerun()
+        with col2:
+            st.markdown(html_right, unsafe_allow_html=True)
+            if st.button(f"{song_right['name']}", use_container_width=True, key="room_right"):
+                cast_room_vote(room, view.round, False)
+                st.rerun()
+
+        if voted:
+            st.caption("✅ Vote in - waiting for the room (you can still change it)")
+        if is_host and st.button("⏩ Close this round now", type="secondary", disabled=cast == 0):
+            room.close_round(member)
+            st.rerun()
+
+    if view.ranked:
+        st.markdown("---")
+        st.markdown(f"#### 📊 Room ranking ({len(view.ranked)} songs)")
+        for i, song in enumerate(view.ranked, 1):
+            score = get_beli_score(i, len(view.ranked))
+            st.markdown(f"**#{i}** {song['name']} - {song['artist']} `{score}`")
+
+    st.markdown("---")
+    if st.button("🚪 Leave room", type="secondary"):
+        leave_room(room)
+        st.rerun()
+
+    if not view.done:
+        watch_room(room, view.round)
+
+
+@st.fragment(run_every=ROOM_POLL_SECONDS)
+def watch_room(room: rooms.Room, shown_round: int):
+    """Re-render for every member (voted or not) once the room moves on"""
+    # Lock-free reads, so polling from every open page is cheap; touching
+    # keeps members who are only watching from being swept as idle
+    if room.view.round != shown_round or not room.touch(st.session_state.room_member):
+        st.rerun()
+
+
+def render_join_room(code: str) -> bool:
+    """Join screen for an invite link; False if the room doesn't exist"""
+    room = get_room_registry().get(code)
+    if room is None:
+        st.warning("That group room has closed or the code is wrong.")
+        del st.query_params['room']
+        return False
+
+    st.markdown(f"### 👥 Join {room.name}")
+    st.caption(f"{len(room.members())} in the room • {len(room.view.ranked)} songs ranked so far")
+    name = st.text_input("Your Name", placeholder="Enter your name...", key="room_name_input")
+    if st.button("Join Room", type="primary", use_container_width=True, disabled=not name):
+        join_room(room, name)
+        st.rerun()
+    return True
 
 
 def main():
+    setup_page()
     init_session_state()
-    all_songs = load_songs()
     
     # Header
     st.markdown('<h1 class="main-title">🪿 Goose Ranker</h1>', unsafe_allow_html=True)
@@ -478,8 +663,12 @@ def main():
     
     # Check for shared rankings in URL
     params = st.query_params
+    if 'c' in params and not st.session_state.setup_complete:
+        if not resume_from_checkpoint(params['c'], load_song_index()):
+            st.warning("That saved-progress link doesn't match the current song list, so it couldn't be resumed.")
+            del st.query_params['c']
     if 'r' in params and not st.session_state.setup_complete:
-        shared_name, shared_rankings = decode_rankings(params['r'], all_songs)
+        shared_name, shared_rankings = decode_rankings(params['r'], load_songs())
         if shared_rankings:
             st.markdown(f'### 👀 Viewing {shared_name}\'s Rankings')
             st.markdown(f"*{len(shared_rankings)} songs ranked*")
@@ -503,6 +692,14 @@ def main():
                 st.query_params.clear()
                 st.rerun()
             return
+
+    # Group rooms
+    room = get_room()
+    if room is not None:
+        render_room(room)
+        return
+    if 'room' in params and render_join_room(params['room']):
+        return
     
     # Setup screen
     if not st.session_state.setup_complete:
@@ -547,46 +744,123 @@ def main():
                 label_visibility="collapsed"
             )
 
+        # Extra filters - evaluated against the bitmap index
+        song_index = load_song_index()
+        with st.expander("🔎 More filters"):
+            artists = st.multiselect(
+                "Artists",
+                song_index.artists,
+                placeholder="Any artist",
+                key="artist_filter"
+            )
+            source = st.radio(
+                "Originals from",
+                ["Goose + side projects", "Goose only", "Side projects only"],
+                horizontal=True,
+                key="origin_filter"
+            )
+            first_year, last_year = song_index.year_range
+            years = None
+            if first_year is not None and first_year < last_year:
+                years = st.slider(
+                    "Debut year",
+                    min_value=first_year,
+                    max_value=last_year,
+                    value=(first_year, last_year),
+                    key="year_filter"
+                )
+                if years == (first_year, last_year):
+                    years = None
+            min_plays = st.number_input(
+                "Minimum times played",
+                min_value=0,
+                value=0,
+                step=5,
+                key="min_plays_filter"
+            )
+
+        origins = ['cover']
+        if source != "Side projects only":
+            origins.append('original')
+        if source != "Goose only":
+            origins.append('side_project')
+        pool_filters = {
+            'artists': artists,
+            'origins': origins,
+            'years': years,
+            'min_plays': min_plays,
+        }
+
         # Preview
         st.markdown("---")
-        preview_pool = all_songs.copy()
-        if include_covers == "No":
-            preview_pool = [s for s in preview_pool if s['category'] != 'cover']
-        preview_pool.sort(key=lambda x: x.get('times_played', 0), reverse=True)
         limit = POOL_PRESETS.get(pool_size)
         if limit == -1:  # Custom option
             limit = custom_size
-        if limit:
-            preview_pool = preview_pool[:limit]
-        
-        originals = sum(1 for s in preview_pool if s['category'] == 'original')
-        covers = sum(1 for s in preview_pool if s['category'] == 'cover')
+        # Counts come straight from the bitmaps - no need to build the pool on every rerun
+        preview_mask = select_mask(song_index, pool_filters, include_covers=(include_covers == "Yes"), limit=limit or None)
+        pool_count = preview_mask.bit_count()
+        covers = (preview_mask & song_index.by_origin['cover']).bit_count()
+        originals = pool_count - covers
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Songs", len(preview_pool))
+            st.metric("Total Songs", pool_count)
         with col2:
             st.metric("Originals", originals)
         with col3:
             st.metric("Covers", covers)
         
         st.markdown("**Top songs in your pool:**")
-        top_preview = ", ".join([s['name'] for s in preview_pool[:8]])
+        top_preview = ", ".join([s['name'] for s in song_index.top(preview_mask, 8)])
         st.markdown(f"*{top_preview}...*")
         
+        st.markdown("#### 🏆 What do you want?")
+        mode_label = st.radio(
+            "Ranking mode",
+            ["Rank every song", "Find my Top K", "Tier list"],
+            horizontal=True,
+            key="mode_radio",
+            label_visibility="collapsed"
+        )
+        top_k = None
+        if mode_label == "Find my Top K":
+            top_k = st.number_input(
+                "How many favorites?",
+                min_value=1,
+                max_value=max(1, pool_count),
+                value=min(10, max(1, pool_count)),
+                key="top_k_input"
+            )
+            if top_k >= pool_count - 1:
+                st.caption("*That's (nearly) your whole pool, so you'll rank every song - it takes fewer comparisons than a tournament.*")
+            else:
+                st.caption("*A knockout tournament finds your favorites without ordering the rest - far fewer comparisons.*")
+        elif mode_label == "Tier list":
+            st.caption(f"*Drop each song into a tier ({'/'.join(ranking.TIERS)}) with one click, then sort only the tiers you care about.*")
+        
+        save_progress = st.checkbox(
+            "💾 Save progress in the URL (bookmark or refresh to resume)",
+            value=st.session_state.save_progress_in_url,
+            key="save_progress_checkbox"
+        )
+        
         st.markdown("---")
         
-        # Start button
-        if st.button("🚀 Start Ranking!", type="primary", use_container_width=True, disabled=not name):
+        # Start button - a ranking needs at least two songs to compare
+        pool_too_small = pool_count < 2
+        if st.button("🚀 Start Ranking!", type="primary", use_container_width=True, disabled=not name or pool_too_small):
             st.session_state.user_name = name
             st.session_state.pool_size = pool_size
             if pool_size == "Custom":
                 st.session_state.custom_pool_size = custom_size
             st.session_state.include_covers = (include_covers == "Yes")
+            st.session_state.pool_filters = pool_filters
+            st.session_state.ranking_mode = {"Find my Top K": 'topk', "Tier list": 'tiers'}.get(mode_label, 'full')
+            st.session_state.top_k = top_k
             st.session_state.setup_complete = True
 
             # Initialize pool - keep sorted by play frequency (most played first)
-            pool = get_filtered_pool(all_songs)
+            pool = get_filtered_pool(song_index)
             # Pool is already sorted by times_played in descending order from get_filtered_pool
             st.session_state.unranked_songs = pool
             st.session_state.ranked_songs = []
@@ -594,10 +868,48 @@ def main():
             # Set up initial head-to-head
             setup_initial_matchup()
 
+            st.session_state.save_progress_in_url = save_progress
+            st.session_state.action_history = []
+            st.session_state.checkpoint = None
+            if save_progress:
+                st.session_state.checkpoint = checkpoint.new_checkpoint(
+                    name, song_index, pool, st.session_state.ranking_mode, st.session_state.top_k
+                )
+                sync_checkpoint()
+
             st.rerun()
         
         if not name:
             st.caption("*Enter your name to continue*")
+        elif pool_too_small:
+            st.caption("*Loosen the filters - a ranking needs at least two songs*")
+
+        # Group room - same pool and mode, answered together
+        with st.expander("👥 Rank with a group"):
+            st.caption("*Everyone in the room votes on the same pair. Once enough people have voted, the winner is placed and the next pair goes out to the whole room.*")
+            voting_label = st.radio(
+                "Voting",
+                ["Majority", "Weighted"],
+                horizontal=True,
+                key="room_voting_radio"
+            )
+            host_weight = 1
+            if voting_label == "Weighted":
+                host_weight = st.number_input("Your vote counts as", min_value=1, max_value=5, value=2, key="room_weight_input")
+            quorum = st.slider("Votes needed to move on (% of the room)", min_value=10, max_value=100, value=50, step=10, key="room_quorum_slider")
+            if mode_label == "Tier list":
+                st.caption("*Tier lists are personal - pick another mode to rank as a group.*")
+            if st.button("👥 Create Room", use_container_width=True, disabled=not name or pool_too_small or mode_label == "Tier list"):
+                room = get_room_registry().create(
+                    f"{name}'s room",
+                    song_index.top(preview_mask),
+                    mode='topk' if mode_label == "Find my Top K" else 'full',
+                    top_k=top_k,
+                    voting=voting_label.lower(),
+                    quorum=quorum / 100,
+                )
+                join_room(room, name, host_weight)
+                st.rerun()
         
         return
     
@@ -610,18 +922,154 @@ def main():
         # Progress
         total_pool = len(st.session_state.ranked_songs) + len(st.session_state.unranked_songs)
         ranked_count = len(st.session_state.ranked_songs)
+        topk_mode = st.session_state.ranking_mode == 'topk'
+        tier_mode = st.session_state.ranking_mode == 'tiers'
         
-        if total_pool > 0:
+        if tier_mode and total_pool > 0:
+            placed = total_pool - len(st.session_state.unranked_songs)
+            st.progress(placed / total_pool)
+            st.markdown(f'<p class="progress-text">Placed {placed} of {total_pool} songs in tiers • {st.session_state.total_comparisons} choices made</p>', unsafe_allow_html=True)
+        elif topk_mode and st.session_state.top_k:
+            st.progress(ranked_count / st.session_state.top_k)
+            st.markdown(f'<p class="progress-text">Found {ranked_count} of your Top {st.session_state.top_k} from {total_pool} songs • {st.session_state.total_comparisons} comparisons made</p>', unsafe_allow_html=True)
+        elif total_pool > 0:
             progress = ranked_count / total_pool
             st.progress(progress)
             st.markdown(f'<p class="progress-text">Ranked {ranked_count} of {total_pool} songs • {st.session_state.total_comparisons} comparisons made</p>', unsafe_allow_html=True)
         
         st.markdown("---")
         
+        # TOP K TOURNAMENT
+        if topk_mode:
+            if st.session_state.ranking_in_progress:
+                song_a = st.session_state.song_a
+                song_b = st.session_state.song_b
+                html_a, html_b = get_pair_html((song_a, song_b))
+                schedule_precompute()
+
+                st.markdown("### 🎯 Which song do you prefer?")
+                st.markdown(f"*Knockout round - looking for favorite #{ranked_count + 1}*")
+
+                st.markdown("---")
+
+                # Two cards side by side
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.markdown(html_a, unsafe_allow_html=True)
+
+                    if st.button(f"{song_a['name']}", use_container_width=True, key="match_a"):
+                        process_answer(picked_left=True)
+                        st.rerun()
+
+                with col2:
+                    st.markdown(html_b, unsafe_allow_html=True)
+
+                    if st.button(f"{song_b['name']}", use_container_width=True, key="match_b"):
+                        process_answer(picked_left=False)
+                        st.rerun()
+
+                st.markdown("---")
+                if st.button("↩️ Undo", type="secondary", use_container_width=True, key="undo_match", disabled=len(st.session_state.action_history) == 0):
+                    undo_last_action()
+                    st.rerun()
+            else:
+                st.markdown("### 🎉 All Done!")
+                st.markdown(f"You've found your Top {ranked_count} in {st.session_state.total_comparisons} comparisons!")
+                st.markdown("Check out the **My Rankings** tab to see your results and share!")
+
+        # TIER LIST
+        elif tier_mode:
+            active_tier = st.session_state.active_tier
+            if active_tier:
+                song_left, song_right = ranking.current_pair(st.session_state)
+                html_left, html_right = get_pair_html((song_left, song_right))
+                schedule_precompute()
+
+                st.markdown("### 🎯 Which song do you prefer?")
+                st.markdown(f"*Sorting your {active_tier} tier*")
+
+                st.markdown("---")
+
+                # Two cards side by side
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.markdown(html_left, unsafe_allow_html=True)
+
+                    if st.button(f"{song_left['name']}", use_container_width=True, key="tier_left"):
+                        process_answer(picked_left=True)
+                        st.rerun()
+
+                with col2:
+                    st.markdown(html_right, unsafe_allow_html=True)
+
+                    if st.button(f"{song_right['name']}", use_container_width=True, key="tier_right"):
+                        process_answer(picked_left=False)
+                        st.rerun()
+
+                st.markdown("---")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("↩️ Undo", type="secondary", use_container_width=True, key="undo_tier_sort", disabled=len(st.session_state.action_history) == 0):
+                        undo_last_action()
+                        st.rerun()
+                with col2:
+                    if st.button("⏸️ Stop sorting", type="secondary", use_container_width=True, key="close_tier"):
+                        close_tier()
+                        st.rerun()
+
+            elif st.session_state.current_song:
+                current = st.session_state.current_song
+
+                st.markdown("### 🏷️ Which tier does this song belong in?")
+
+                st.markdown(render_song_card(current), unsafe_allow_html=True)
+
+                tier_cols = st.columns(len(ranking.TIERS))
+                for col, tier in zip(tier_cols, ranking.TIERS):
+                    with col:
+                        if st.button(tier, use_container_width=True, key=f"tier_{tier}"):
+                            place_in_tier(tier)
+                            st.rerun()
+
+                st.markdown("---")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("↩️ Undo", type="secondary", use_container_width=True, key="undo_tier", disabled=len(st.session_state.action_history) == 0):
+                        undo_last_action()
+                        st.rerun()
+                with col2:
+                    if st.button("⏭️ Skip", type="secondary", use_container_width=True, key="skip_tier_song"):
+                        skip_current_song()
+                        st.rerun()
+
+            else:
+                st.markdown("### 🎉 Every song has a tier!")
+                st.markdown("Sort any tier below to order the songs inside it, or check out the **My Rankings** tab.")
+
+            # Lazy per-tier sorting - only the tiers you open get ordered
+            if not active_tier:
+                sortable = [
+                    (tier, entry) for tier, entry in st.session_state.tiers.items()
+                    if entry['unsorted'] and len(entry['ranked']) + len(entry['unsorted']) >= 2
+                ]
+                if sortable:
+                    st.markdown("---")
+                    st.markdown("#### 🔀 Sort a tier")
+                    tier_cols = st.columns(len(sortable))
+                    for col, (tier, entry) in zip(tier_cols, sortable):
+                        with col:
+                            if st.button(f"{tier} ({len(entry['unsorted'])} unsorted)", use_container_width=True, key=f"open_{tier}"):
+                                open_tier(tier)
+                                st.rerun()
+
         # INITIAL HEAD-TO-HEAD MATCHUP
-        if st.session_state.initial_matchup and st.session_state.song_a and st.session_state.song_b:
+        elif st.session_state.initial_matchup and st.session_state.song_a and st.session_state.song_b:
             song_a = st.session_state.song_a
             song_b = st.session_state.song_b
+            html_a, html_b = get_pair_html((song_a, song_b))
+            schedule_precompute()
             
             st.markdown("### 🎯 Which song do you prefer?")
             st.markdown("*Pick your favorite to start building your rankings*")
@@ -632,26 +1080,14 @@ def main():
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown(f"""
-                <div class="tinder-card" style="min-height: 200px;">
-                    <div class="song-title" style="font-size: 1.5rem;">{song_a['name']}</div>
-                    <div class="song-artist">{song_a['artist']}</div>
-                    <div class="song-plays">Played {song_a.get('times_played', '?')}x</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(html_a, unsafe_allow_html=True)
 
                 if st.button(f"{song_a['name']}", use_container_width=True, key="pick_a"):
                     process_initial_choice(chose_a=True)
                     st.rerun()
 
             with col2:
-                st.markdown(f"""
-                <div class="tinder-card" style="min-height: 200px;">
-                    <div class="song-title" style="font-size: 1.5rem;">{song_b['name']}</div>
-                    <div class="song-artist">{song_b['artist']}</div>
-                    <div class="song-plays">Played {song_b.get('times_played', '?')}x</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(html_b, unsafe_allow_html=True)
 
                 if st.button(f"{song_b['name']}", use_container_width=True, key="pick_b"):
                     process_initial_choice(chose_a=False)
@@ -661,6 +1097,8 @@ def main():
         elif st.session_state.ranking_in_progress and st.session_state.current_song:
             current = st.session_state.current_song
             comparison = get_comparison_song()
+            html_left, html_right = get_pair_html((comparison, current))
+            schedule_precompute()
 
             st.markdown("### 🎯 Which song do you prefer?")
 
@@ -670,26 +1108,14 @@ def main():
             col1, col2 = st.columns(2)
 
             with col1:
-                st.markdown(f"""
-                <div class="tinder-card" style="min-height: 200px;">
-                    <div class="song-title" style="font-size: 1.5rem;">{comparison['name']}</div>
-                    <div class="song-artist">{comparison['artist']}</div>
-                    <div class="song-plays">Played {comparison.get('times_played', '?')}x</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(html_left, unsafe_allow_html=True)
 
                 if st.button(f"{comparison['name']}", use_container_width=True, key="swipe_left"):
                     process_swipe(is_better=False)
                     st.rerun()
 
             with col2:
-                st.markdown(f"""
-                <div class="tinder-card" style="min-height: 200px;">
-                    <div class="song-title" style="font-size: 1.5rem;">{current['name']}</div>
-                    <div class="song-artist">{current['artist']}</div>
-                    <div class="song-plays">Played {current.get('times_played', '?')}x</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(html_right, unsafe_allow_html=True)
 
                 if st.button(f"{current['name']}", use_container_width=True, key="swipe_right"):
                     process_swipe(is_better=True)
@@ -720,7 +1146,7 @@ def main():
             st.markdown("Check out the **My Rankings** tab to see your results and share!")
         
         # Search section (always visible when not done)
-        if st.session_state.unranked_songs and not st.session_state.initial_matchup:
+        if st.session_state.unranked_songs and not st.session_state.initial_matchup and not topk_mode and not st.session_state.active_tier:
             st.markdown("---")
             st.markdown("#### 🔍 Search for a specific song to rank next")
             search = st.text_input("Search", placeholder="Search by name...", label_visibility="collapsed")
@@ -736,9 +1162,7 @@ def main():
                     with col2:
                         if st.button("Rank", key=f"search_{song['name']}"):
                             # Move this song to front of queue
-                            st.session_state.unranked_songs.remove(song)
-                            st.session_state.unranked_songs.insert(0, song)
-                            start_ranking_song(song)
+                            pick_next_song(song)
                             st.rerun()
     
     with tab2:
@@ -786,8 +1210,20 @@ def main():
             st.markdown("---")
             
             # Rankings list
-            for i, song in enumerate(st.session_state.ranked_songs, 1):
-                score = get_beli_score(i, len(st.session_state.ranked_songs))
+            if st.session_state.ranking_mode == 'tiers':
+                ranked_rows = [(song, score, tier) for song, tier, score in ranking.tier_scores(st.session_state)]
+            else:
+                total_ranked = len(st.session_state.ranked_songs)
+                ranked_rows = [
+                    (song, get_beli_score(i, total_ranked), None)
+                    for i, song in enumerate(st.session_state.ranked_songs, 1)
+                ]
+
+            current_tier = None
+            for i, (song, score, tier) in enumerate(ranked_rows, 1):
+                if tier and tier != current_tier:
+                    current_tier = tier
+                    st.markdown(f"#### {tier} Tier")
                 cat_label = "Original" if song['category'] == 'original' else "Cover"
                 cat_class = f"category-{song['category']}"
                 
@@ -822,6 +1258,11 @@ def main():
                 st.session_state.song_a = None
                 st.session_state.song_b = None
                 st.session_state.songs_ranked_count = 0
+                st.session_state.next_states = None
+                st.session_state.pair_html = None
+                st.session_state.checkpoint = None
+                if 'c' in st.query_params:
+                    del st.query_params['c']
                 st.rerun()
     
     with tab3:
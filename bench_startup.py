@@ -0,0 +1,121 @@
+"""Measure time-to-first-pair for cold and warm starts.
+
+Cold: a fresh interpreter imports the engine, loads the catalog (from the
+compiled goose_songs.bin or by parsing the JSON), selects the default pool
+and builds the first pair. Each cold run is its own subprocess, so import
+and load costs are paid every time, like a new worker.
+
+Warm: the index is already loaded (as ``st.cache_resource`` keeps it in a
+running worker) and only a new session is started.
+
+Streamlit itself isn't imported - its import cost is the same either way.
+
+Usage:
+    python bench_startup.py [--catalog goose_songs.json] [--runs 7]
+    python bench_startup.py --record startup_times.jsonl   # append results
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_POOL = 50
+
+
+def first_pair(source: str, catalog_path: str) -> dict:
+    """One cold start in this process; returns per-phase milliseconds"""
+    start = time.perf_counter()
+    import catalog
+    import ranking
+    from pool_index import SongIndex, select_pool
+    imported = time.perf_counter()
+
+    if source == 'bin':
+        index = catalog.load_song_index(catalog_path)
+        if isinstance(index.songs, list):
+            raise SystemExit(f"no fresh .bin for {catalog_path} - run: python catalog.py --compile")
+    else:
+        index = SongIndex(catalog.load_catalog(catalog_path))
+    loaded = time.perf_counter()
+
+    pool = select_pool(index, {}, limit=DEFAULT_POOL)
+    pair = ranking.current_pair(ranking.new_state(pool))
+    assert pair is not None
+    done = time.perf_counter()
+
+    return {
+        'imports_ms': (imported - start) * 1000,
+        'load_ms': (loaded - imported) * 1000,
+        'pair_ms': (done - loaded) * 1000,
+        'total_ms': (done - start) * 1000,
+    }
+
+
+def cold_runs(source: str, catalog_path: str, runs: int) -> list:
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, __file__, '--once', source, '--catalog', catalog_path],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(out))
+    return results
+
+
+def warm_runs(catalog_path: str, runs: int) -> list:
+    import catalog
+    import ranking
+    from pool_index import select_pool
+
+    index = catalog.load_song_index(catalog_path)
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pool = select_pool(index, {}, limit=DEFAULT_POOL)
+        ranking.current_pair(ranking.new_state(pool))
+        results.append({'total_ms': (time.perf_counter() - start) * 1000})
+    return results
+
+
+def median(results: list, key: str) -> float:
+    return statistics.median(r[key] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-pair")
+    parser.add_argument('--catalog', default='goose_songs.json')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--record', help="Append a JSON line with the medians to this file")
+    parser.add_argument('--once', choices=['bin', 'json'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.once:
+        print(json.dumps(first_pair(args.once, args.catalog)))
+        return
+
+    with open(args.catalog, 'r') as f:
+        songs = len(json.load(f)['songs'])
+    record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'catalog': args.catalog, 'songs': songs}
+    print(f"{args.catalog}: {songs} songs, median of {args.runs} runs")
+    for source in ('json', 'bin'):
+        results = cold_runs(source, args.catalog, args.runs)
+        print(f"  cold ({source:>4}): {median(results, 'total_ms'):6.1f}ms  "
+              f"(imports {median(results, 'imports_ms'):.1f}, load {median(results, 'load_ms'):.1f}, "
+              f"first pair {median(results, 'pair_ms'):.1f})")
+        record[f'cold_{source}_ms'] = round(median(results, 'total_ms'), 2)
+    warm = warm_runs(args.catalog, args.runs)
+    print(f"  warm       : {median(warm, 'total_ms'):6.2f}ms")
+    record['warm_ms'] = round(median(warm, 'total_ms'), 3)
+
+    if args.record:
+        with open(args.record, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"Recorded in {os.path.abspath(args.record)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""Precompiled binary song catalog (goose_songs.bin).
+
+``compile_catalog`` packs goose_songs.json into a versioned file of
+little-endian column arrays plus one UTF-8 string table. ``open_catalog``
+memory-maps it and exposes the numeric columns as zero-copy ``memoryview``
+casts; only the string table is decoded (once, in a single call). Song
+dicts are built one at a time with ``song(i)``, so a caller that only needs
+a pool of 50 never pays for the rest of the catalog.
+
+Layout (all offsets from the start of the file, every section 8-byte aligned):
+
+    header      magic, version, song count, BLAKE2b digest of the source JSON
+    directory   one (name, kind, offset, length) entry per column
+    columns     int32 arrays (-1 = missing), uint8 category codes, and
+                uint32 char offsets (count + 1) into the string table;
+                debut_year is precomputed for the pool index
+    strings     UTF-8 text of every string field, concatenated
+
+The header records a hash of the JSON it was built from, so a stale artifact
+is detected even when a checkout or copy leaves the file times unchanged.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+MAGIC = b'GSRB'
+VERSION = 2
+
+HEADER = struct.Struct('<4sHHII16s')     # magic, version, columns, songs, strings len, source digest
+ENTRY = struct.Struct('<16s2sxxQQ')      # name, kind, offset, length (bytes)
+
+STRING_FIELDS = ('name', 'artist', 'first_played', 'last_played')
+INT_FIELDS = ('times_played', 'recent_plays', 'avg_track_seconds')
+CATEGORIES = ('original', 'side_project', 'cover')
+DERIVED_FIELDS = ('debut_year',)         # index-only columns, not part of song dicts
+COLUMN_FORMATS = {'S': 'I', 'I': 'i', 'C': 'B'}   # memoryview cast per column kind
+
+
+def binary_path_for(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + '.bin'
+
+
+def source_digest(data: bytes) -> bytes:
+    """Digest of the source JSON recorded in (and checked against) the header"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def compile_catalog(json_path: str = 'goose_songs.json', out_path: str = None) -> str:
+    """Build the binary artifact next to (or at ``out_path`` for) a JSON catalog"""
+    from pool_index import song_debut_year
+
+    out_path = out_path or binary_path_for(json_path)
+    with open(json_path, 'rb') as f:
+        source = f.read()
+    songs = json.loads(source)['songs']
+
+    text_parts = []
+    text_len = 0
+    columns = []
+
+    for field in STRING_FIELDS:
+        if not any(field in s for s in songs):
+            continue
+        offsets = [text_len]
+        for song in songs:
+            value = song.get(field) or ''
+            text_parts.append(value)
+            text_len += len(value)
+            offsets.append(text_len)
+        columns.append((field, 'S', struct.pack(f'<{len(offsets)}I', *offsets)))
+
+    for field in INT_FIELDS:
+        if not any(field in s for s in songs):
+            continue
+        values = [song.get(field, -1) for song in songs]
+        columns.append((field, 'I', struct.pack(f'<{len(values)}i', *values)))
+
+    years = [song_debut_year(song) for song in songs]
+    columns.append(('debut_year', 'I', struct.pack(f'<{len(years)}i', *(-1 if y is None else y for y in years))))
+
+    codes = [CATEGORIES.index(s['category']) if s['category'] in CATEGORIES else 255 for s in songs]
+    columns.append(('category', 'C', bytes(codes)))
+
+    strings = ''.join(text_parts).encode('utf-8')
+    directory_size = ENTRY.size * len(columns)
+    offset = _align(HEADER.size + directory_size)
+    entries = []
+    for name, kind, data in columns:
+        entries.append(ENTRY.pack(name.encode(), kind.encode().ljust(2), offset, len(data)))
+        offset = _align(offset + len(data))
+    strings_offset = offset
+
+    # Per-process temp name, so workers compiling at once don't share a file
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(columns), len(songs), len(strings),
+                            source_digest(source)))
+        f.write(b''.join(entries))
+        for (_, _, data), entry in zip(columns, entries):
+            f.seek(ENTRY.unpack(entry)[2])
+            f.write(data)
+        f.seek(strings_offset)
+        f.write(strings)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class BinaryCatalog:
+    """Memory-mapped view over a compiled catalog"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = [memoryview(self._mmap)]
+        self.columns = {}
+        self.kinds = {}
+        try:
+            self._load(self._views[0])
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self, view: memoryview):
+        magic, version, n_columns, self.count, strings_len, self.source_digest = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a compatible binary catalog")
+
+        end = HEADER.size
+        for i in range(n_columns):
+            raw_name, kind, offset, length = ENTRY.unpack_from(view, HEADER.size + i * ENTRY.size)
+            name = raw_name.rstrip(b'\0').decode()
+            kind = kind.decode().strip()
+            if kind not in COLUMN_FORMATS or offset + length > len(view):
+                raise ValueError(f"corrupt column {name!r}")
+            section = view[offset:offset + length]
+            self._views.append(section)
+            column = section.cast(COLUMN_FORMATS[kind])
+            self._views.append(column)
+            if len(column) != self.count + (kind == 'S'):
+                raise ValueError(f"column {name!r} doesn't match the song count")
+            self.columns[name] = column
+            self.kinds[name] = kind
+            end = max(end, _align(offset + length))
+        if end + strings_len > len(view) or 'category' not in self.columns:
+            raise ValueError("truncated binary catalog")
+        self.text = bytes(view[end:end + strings_len]).decode('utf-8')
+
+    def is_fresh(self, json_path: str) -> bool:
+        """True if built from the JSON file as it is on disk now"""
+        try:
+            with open(json_path, 'rb') as f:
+                return source_digest(f.read()) == self.source_digest
+        except OSError:
+            return True
+
+    def strings(self, field: str) -> list:
+        """Whole string column as a list ('' where missing)"""
+        if field not in self.columns:
+            return [''] * self.count
+        offsets = self.columns[field].tolist()
+        text = self.text
+        return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+
+    def ints(self, field: str) -> list:
+        """Whole integer column as a list (-1 where missing)"""
+        if field not in self.columns:
+            return [-1] * self.count
+        return self.columns[field].tolist()
+
+    def categories(self) -> list:
+        return [CATEGORIES[c] if c < len(CATEGORIES) else 'other' for c in self.columns['category'].tolist()]
+
+    def song(self, i: int) -> dict:
+        """One song dict in goose_songs.json shape"""
+        song = {}
+        for field, kind in self.kinds.items():
+            if field in DERIVED_FIELDS:
+                continue
+            column = self.columns[field]
+            if kind == 'S':
+                value = self.text[column[i]:column[i + 1]]
+                if value:
+                    song[field] = value
+            elif kind == 'I':
+                if column[i] != -1:
+                    song[field] = column[i]
+            else:
+                song[field] = CATEGORIES[column[i]] if column[i] < len(CATEGORIES) else 'other'
+        return song
+
+    def close(self):
+        self.columns = {}
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+
+def open_catalog(json_path: str = 'goose_songs.json'):
+    """Open the compiled catalog for ``json_path``, or None if missing/stale/corrupt"""
+    path = binary_path_for(json_path)
+    try:
+        catalog = BinaryCatalog(path)
+    except (OSError, ValueError, TypeError, struct.error):
+        return None
+    if not catalog.is_fresh(json_path):
+        catalog.close()
+        return None
+    return catalog
+
+
+def open_or_compile(json_path: str = 'goose_songs.json'):
+    """``open_catalog``, first (re)compiling a missing or stale artifact when
+    its directory is writable; None if there's still no usable binary"""
+    catalog = open_catalog(json_path)
+    if catalog is not None or not os.path.exists(json_path):
+        return catalog
+    if not os.access(os.path.dirname(os.path.abspath(json_path)), os.W_OK):
+        return None
+    try:
+        compile_catalog(json_path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return open_catalog(json_path)
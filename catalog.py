@@ -0,0 +1,285 @@
+"""Load goose_songs.json, and build it from El Goose.net setlist exports.
+
+Setlist dumps are the JSON files returned by the El Goose.net ``setlists``
+API (``{"error": false, "data": [...]}``, one row per song performance), or a
+bare list of those rows. Processed shows and per-song aggregates are cached
+on disk, so a refresh only reads files that changed and only counts shows it
+has not seen before.
+
+Usage:
+    python catalog.py setlists/ --out goose_songs.json
+    python catalog.py --compile            # just rebuild goose_songs.bin
+"""
+
+import json
+import os
+from datetime import date
+
+from pool_index import SongIndex
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = '.catalog_cache.json'
+DEFAULT_RECENT_MONTHS = 12
+
+BAND = 'Goose'
+SIDE_PROJECT_ARTISTS = {'Vasudo', 'Great Blue', 'Swimmer', 'Orebolo', "St. John's Revival"}
+
+CATEGORIES = {
+    'original': 'Songs written by Goose',
+    'side_project': "Songs from Vasudo, Great Blue, Swimmer, Orebolo, St. John's Revival",
+    'cover': 'Cover songs performed by Goose',
+}
+
+
+def load_catalog(path: str = 'goose_songs.json') -> list:
+    """Load the catalog for ranking - side projects are labelled original.
+
+    The source category is kept as ``origin`` so pools can still filter
+    Goose originals and side projects separately.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    return [prepare_song(song) for song in data['songs']]
+
+
+def prepare_song(song: dict) -> dict:
+    """Record the source category as ``origin`` and fold side projects into originals"""
+    song['origin'] = song['category']
+    if song['category'] == 'side_project':
+        song['category'] = 'original'
+    return song
+
+
+def load_song_index(path: str = 'goose_songs.json') -> SongIndex:
+    """Pool index for a catalog, opened from the compiled .bin when it's fresh.
+
+    With the binary catalog only the indexed columns are read up front; song
+    dicts are built when a pool first touches them. A missing or stale
+    artifact is recompiled on the spot if its directory is writable;
+    otherwise this falls back to parsing the JSON.
+    """
+    from binary_catalog import open_or_compile
+
+    compiled = open_or_compile(path)
+    if compiled is None:
+        return SongIndex(load_catalog(path))
+    return SongIndex.from_columns(
+        lambda i: prepare_song(compiled.song(i)),
+        names=compiled.strings('name'),
+        artists=compiled.strings('artist'),
+        origins=compiled.categories(),
+        years=[y if y >= 0 else None for y in compiled.ints('debut_year')],
+        plays=[max(p, 0) for p in compiled.ints('times_played')],
+    )
+
+
+def empty_cache() -> dict:
+    """A cache with nothing processed yet"""
+    return {'version': CACHE_VERSION, 'files': {}, 'shows': [], 'songs': {}}
+
+
+def load_cache(path: str) -> dict:
+    """Load the ingestion cache, starting over if it is missing or outdated"""
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty_cache()
+    if cache.get('version') != CACHE_VERSION:
+        return empty_cache()
+    return cache
+
+
+def save_cache(cache: dict, path: str):
+    """Write the cache atomically so an interrupted run can't corrupt it"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_setlist_rows(path: str) -> list:
+    """Read the performance rows from one setlist export file"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('data') or []
+    return data
+
+
+def song_category(row: dict) -> str:
+    """Classify a performance as original, side_project or cover"""
+    artist = row.get('original_artist') or BAND
+    if artist in SIDE_PROJECT_ARTISTS:
+        return 'side_project'
+    if artist == BAND or str(row.get('isoriginal', '0')) == '1':
+        return 'original'
+    return 'cover'
+
+
+def parse_track_time(value) -> int:
+    """Parse an El Goose ``tracktime`` (``"mm:ss"`` or ``"h:mm:ss"``) to seconds"""
+    if not value:
+        return 0
+    seconds = 0
+    try:
+        for part in str(value).split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return 0
+    return seconds
+
+
+def ingest_rows(cache: dict, rows: list, seen_shows: set) -> int:
+    """Fold performances from unseen shows into the cache; return new show count"""
+    songs = cache['songs']
+    new_shows = set()
+
+    for row in rows:
+        show_id = str(row.get('show_id', row.get('showdate', '')))
+        if show_id in seen_shows:
+            continue
+        name = row.get('songname')
+        show_date = row.get('showdate')
+        if not name or not show_date:
+            continue
+        new_shows.add(show_id)
+
+        song = songs.get(name)
+        if song is None:
+            song = songs[name] = {
+                'artist': row.get('original_artist') or BAND,
+                'category': song_category(row),
+                'dates': [],
+                'track_seconds': 0,
+                'timed_plays': 0,
+            }
+        song['dates'].append(show_date)
+        seconds = parse_track_time(row.get('tracktime'))
+        if seconds:
+            song['track_seconds'] += seconds
+            song['timed_plays'] += 1
+
+    seen_shows.update(new_shows)
+    return len(new_shows)
+
+
+def months_before(day: date, months: int) -> date:
+    """Same day of month ``months`` earlier (clamped to the 28th)"""
+    total = day.year * 12 + day.month - 1 - months
+    return date(total // 12, total % 12 + 1, min(day.day, 28))
+
+
+def build_catalog(cache: dict, recent_months: int = DEFAULT_RECENT_MONTHS) -> dict:
+    """Derive the goose_songs.json structure from cached aggregates"""
+    all_dates = [max(song['dates']) for song in cache['songs'].values() if song['dates']]
+    latest = max(all_dates) if all_dates else date.today().isoformat()
+    recent_cutoff = months_before(date.fromisoformat(latest), recent_months).isoformat()
+
+    songs = []
+    for name, song in cache['songs'].items():
+        dates = song['dates']
+        entry = {
+            'name': name,
+            'artist': song['artist'],
+            'category': song['category'],
+            'first_played': min(dates),
+            'times_played': len(dates),
+            'last_played': max(dates),
+            'recent_plays': sum(1 for d in dates if d > recent_cutoff),
+        }
+        if song['timed_plays']:
+            entry['avg_track_seconds'] = song['track_seconds'] // song['timed_plays']
+        songs.append(entry)
+    songs.sort(key=lambda s: s['name'].lower())
+
+    return {
+        'songs': songs,
+        'metadata': {
+            'source': 'El Goose.net',
+            'last_updated': latest,
+            'total_songs': len(songs),
+            'shows': len(cache['shows']),
+            'recent_months': recent_months,
+            'categories': CATEGORIES,
+        },
+    }
+
+
+def refresh_catalog(setlist_dir: str, out_path: str = 'goose_songs.json',
+                    cache_path: str = DEFAULT_CACHE,
+                    recent_months: int = DEFAULT_RECENT_MONTHS) -> dict:
+    """Ingest new or changed setlist files and rewrite the catalog if needed.
+
+    Returns a small summary dict (files read, new shows, whether the catalog
+    was written).
+    """
+    cache = load_cache(cache_path)
+    seen_shows = set(cache['shows'])
+    files_read = 0
+    new_shows = 0
+
+    for entry in sorted(os.scandir(setlist_dir), key=lambda e: e.name):
+        if not entry.is_file() or not entry.name.endswith('.json'):
+            continue
+        stat = entry.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        if cache['files'].get(entry.name) == signature:
+            continue
+        new_shows += ingest_rows(cache, read_setlist_rows(entry.path), seen_shows)
+        cache['files'][entry.name] = signature
+        files_read += 1
+
+    written = False
+    stale_window = cache.get('recent_months') != recent_months
+    if files_read or stale_window:
+        cache['shows'] = sorted(seen_shows)
+        cache['recent_months'] = recent_months
+        save_cache(cache, cache_path)
+    if new_shows or stale_window or not os.path.exists(out_path):
+        catalog = build_catalog(cache, recent_months)
+        # Write then rename, so a running app never reads a half-written catalog
+        tmp_path = out_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write('{\n  "songs": [\n')
+            f.write(',\n'.join('    ' + json.dumps(s, ensure_ascii=False) for s in catalog['songs']))
+            f.write('\n  ],\n  "metadata": ')
+            f.write(json.dumps(catalog['metadata'], indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            f.write('\n}\n')
+        os.replace(tmp_path, out_path)
+        written = True
+
+    return {'files_read': files_read, 'new_shows': new_shows, 'written': written}
+
+
+def main():
+    import argparse
+    import time
+
+    from binary_catalog import compile_catalog
+
+    parser = argparse.ArgumentParser(description="Build goose_songs.json from El Goose.net setlist exports")
+    parser.add_argument('setlist_dir', nargs='?', help="Directory of setlist export .json files")
+    parser.add_argument('--compile', action='store_true',
+                        help="Only compile the existing catalog into its binary (.bin) form")
+    parser.add_argument('--out', default='goose_songs.json', help="Catalog file to write")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Ingestion cache file")
+    parser.add_argument('--months', type=int, default=DEFAULT_RECENT_MONTHS,
+                        help="Window for the recent_plays stat")
+    args = parser.parse_args()
+
+    if not args.setlist_dir and not args.compile:
+        parser.error("give a setlist directory, or --compile")
+
+    start = time.perf_counter()
+    if args.setlist_dir:
+        summary = refresh_catalog(args.setlist_dir, args.out, args.cache, args.months)
+        print(f"Read {summary['files_read']} file(s), {summary['new_shows']} new show(s), "
+              f"catalog {'updated' if summary['written'] else 'unchanged'}")
+    compiled = compile_catalog(args.out)
+    print(f"Compiled {compiled} in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
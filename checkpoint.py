@@ -0,0 +1,243 @@
+"""Compact, replayable ranking checkpoints for the URL query string.
+
+The ranking engine is deterministic, so instead of serialising the ranked
+list, queue and binary-search window we store *how we got there*: the pool
+(one bit per catalog song), the ranking mode and the user's clicks as a bit
+stream:
+
+    0x   answer, x = 1 if the left song was picked
+    10   skip the current song
+    11 + operand    operand < pool size: rank that pool song next;
+                    otherwise a tier-list command (place in / open / close tier)
+
+Each click appends two bits, so a full 257-song ranking (~1,700 clicks)
+fits in roughly 450 bytes, and recording a click never re-encodes the
+state. Decoding replays the events through ``ranking`` to rebuild the exact
+session, including ``comparison_left``/``comparison_right``.
+"""
+
+import base64
+import zlib
+
+import ranking
+
+VERSION = 3
+
+MODES = ('full', 'topk', 'tiers')
+# Tier-list commands take operands after the pool positions
+TIER_COMMANDS = ('assign', 'open')
+
+ANSWER = 0b0
+SKIP = 0b10
+PICK = 0b11
+
+
+class Checkpoint:
+    """Event log for one ranking session, appended to on every click"""
+
+    def __init__(self, name: str, pool_mask: int, catalog_size: int, catalog_tag: int,
+                 mode: str = 'full', top_k: int = None):
+        self.name = name
+        self.mode = mode
+        self.top_k = top_k
+        self.pool_mask = pool_mask
+        self.catalog_size = catalog_size
+        self.catalog_tag = catalog_tag
+        self.pool_size = pool_mask.bit_count()
+        operands = self.pool_size + len(TIER_COMMANDS) * len(ranking.TIERS) + 1
+        self.pick_width = max(1, (operands - 1).bit_length())
+        self.bits = 0
+        self.nbits = 0
+        self._header = None
+
+    def _append(self, value: int, width: int):
+        self.bits = (self.bits << width) | value
+        self.nbits += width
+
+    def record_answer(self, picked_left: bool):
+        self._append((ANSWER << 1) | int(picked_left), 2)
+
+    def record_skip(self):
+        self._append(SKIP, 2)
+
+    def record_pick(self, position: int):
+        self._append(PICK, 2)
+        self._append(position, self.pick_width)
+
+    def record_tier_command(self, kind: str, tier: str = None):
+        """Record placing a song in / opening a tier, or closing the open one"""
+        operand = self.pool_size + len(TIER_COMMANDS) * len(ranking.TIERS)
+        if kind != 'close':
+            operand = self.pool_size + TIER_COMMANDS.index(kind) * len(ranking.TIERS) + ranking.TIERS.index(tier)
+        self.record_pick(operand)
+
+    def truncate(self, nbits: int):
+        """Drop events recorded after the log was ``nbits`` long (for undo)"""
+        if nbits < self.nbits:
+            self.bits >>= self.nbits - nbits
+            self.nbits = nbits
+
+    def header(self) -> bytes:
+        """Version, catalog fingerprint, name, mode and pool bitmap (cached)"""
+        if self._header is None:
+            name = self.name.encode()[:255]
+            mask_len = (self.catalog_size + 7) // 8
+            self._header = (
+                bytes([VERSION])
+                + _varint(self.catalog_size)
+                + self.catalog_tag.to_bytes(2, 'big')
+                + bytes([len(name)]) + name
+                + bytes([MODES.index(self.mode)]) + _varint(self.top_k or 0)
+                + self.pool_mask.to_bytes(mask_len, 'little')
+            )
+        return self._header
+
+    def encode(self) -> str:
+        """URL-safe checkpoint code"""
+        events = self.bits.to_bytes((self.nbits + 7) // 8, 'big')
+        raw = self.header() + _varint(self.nbits) + events
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def events(self):
+        """Yield ``(kind, value)`` tuples in click order"""
+        pos = self.nbits
+        while pos >= 2:
+            pos -= 2
+            code = (self.bits >> pos) & 0b11
+            if code <= 1:
+                yield 'answer', bool(code)
+            elif code == SKIP:
+                yield 'skip', None
+            else:
+                if pos < self.pick_width:
+                    raise ValueError("truncated pick event")
+                pos -= self.pick_width
+                operand = (self.bits >> pos) & ((1 << self.pick_width) - 1)
+                if operand < self.pool_size:
+                    yield 'pick', operand
+                    continue
+                command, tier = divmod(operand - self.pool_size, len(ranking.TIERS))
+                if command < len(TIER_COMMANDS):
+                    yield TIER_COMMANDS[command], ranking.TIERS[tier]
+                elif command == len(TIER_COMMANDS) and tier == 0:
+                    yield 'close', None
+                else:
+                    raise ValueError("unknown checkpoint command")
+
+
+def catalog_tag(names: list) -> int:
+    """16-bit fingerprint of catalog order, to reject codes from other catalogs"""
+    return zlib.crc32('\n'.join(names).encode()) & 0xFFFF
+
+
+def pool_position(checkpoint: Checkpoint, index, song: dict) -> int:
+    """Position of a song within the checkpoint's pool (for pick events)"""
+    bit = index.bit_of[song['name']]
+    return (checkpoint.pool_mask & ((1 << bit) - 1)).bit_count()
+
+
+def new_checkpoint(name: str, index, pool: list, mode: str = 'full', top_k: int = None) -> Checkpoint:
+    """Start a checkpoint for a pool drawn from a ``pool_index.SongIndex``"""
+    return Checkpoint(name, index.mask_of(pool), len(index.names), catalog_tag(index.names), mode, top_k)
+
+
+def decode_checkpoint(code: str, index) -> Checkpoint:
+    """Parse a checkpoint code, or raise ValueError if it doesn't fit the catalog"""
+    try:
+        raw = base64.urlsafe_b64decode(code + '=' * (-len(code) % 4))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid checkpoint code") from e
+    if not raw or raw[0] != VERSION:
+        raise ValueError("unsupported checkpoint version")
+    try:
+        return _parse(raw, index)
+    except IndexError as e:
+        raise ValueError("truncated checkpoint") from e
+
+
+def _parse(raw: bytes, index) -> Checkpoint:
+    pos = 1
+    catalog_size, pos = _read_varint(raw, pos)
+    tag = int.from_bytes(raw[pos:pos + 2], 'big')
+    pos += 2
+    if catalog_size != len(index.names) or tag != catalog_tag(index.names):
+        raise ValueError("checkpoint was made with a different catalog")
+
+    name_len = raw[pos]
+    name = raw[pos + 1:pos + 1 + name_len].decode(errors='replace')
+    pos += 1 + name_len
+    if raw[pos] >= len(MODES):
+        raise ValueError("unknown ranking mode")
+    mode = MODES[raw[pos]]
+    top_k, pos = _read_varint(raw, pos + 1)
+    if mode == 'topk' and top_k < 1:
+        raise ValueError("Top K checkpoint without a valid K")
+    mask_len = (catalog_size + 7) // 8
+    pool_mask = int.from_bytes(raw[pos:pos + mask_len], 'little')
+    if pool_mask >> catalog_size:
+        raise ValueError("pool has songs outside the catalog")
+    pos += mask_len
+
+    checkpoint = Checkpoint(name, pool_mask, catalog_size, tag, mode, top_k or None)
+    checkpoint.nbits, pos = _read_varint(raw, pos)
+    events = raw[pos:]
+    if len(events) != (checkpoint.nbits + 7) // 8:
+        raise ValueError("truncated checkpoint")
+    checkpoint.bits = int.from_bytes(events, 'big')
+    return checkpoint
+
+
+def replay(checkpoint: Checkpoint, index) -> dict:
+    """Rebuild the ranking state a checkpoint describes"""
+    pool = index.top(checkpoint.pool_mask)
+    state = ranking.new_state(pool, checkpoint.mode, checkpoint.top_k)
+    for kind, value in checkpoint.events():
+        if kind == 'answer':
+            if ranking.current_pair(state) is None:
+                raise ValueError("checkpoint has more answers than comparisons")
+            state = ranking.answer(state, value)
+        elif kind in ('skip', 'pick') and state['ranking_mode'] == 'topk':
+            raise ValueError("skip or pick in a Top K checkpoint")
+        elif kind == 'skip':
+            state = ranking.skip_song(state)
+        elif kind in ('assign', 'open', 'close'):
+            if state['ranking_mode'] != 'tiers':
+                raise ValueError("tier command in a non-tier checkpoint")
+            if kind == 'assign':
+                if not state['current_song'] or state['active_tier']:
+                    raise ValueError("checkpoint places a song that isn't on screen")
+                state = ranking.assign_tier(state, value)
+            elif kind == 'open':
+                state = ranking.open_tier(state, value)
+            else:
+                state = ranking.close_tier(state)
+        else:
+            if value >= len(pool) or pool[value] not in state['unranked_songs']:
+                raise ValueError("checkpoint picks an unavailable song")
+            state = ranking.pick_song(state, pool[value])
+    return state
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(raw: bytes, pos: int) -> tuple:
+    value = shift = 0
+    while True:
+        if pos >= len(raw):
+            raise ValueError("truncated checkpoint")
+        byte = raw[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
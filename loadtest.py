@@ -0,0 +1,190 @@
+"""Load test for api.py - many concurrent simulated rankers on one machine.
+
+Each simulated user keeps one keep-alive connection, starts a session,
+answers comparisons with a consistent random taste, peeks at the session
+now and then, undoes once and finally fetches the ranking and a share code.
+Reports requests/sec and latency percentiles.
+
+Usage:
+    python loadtest.py --spawn --users 1000
+    python loadtest.py --url http://127.0.0.1:8765 --users 2000 --answers 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+class Client:
+    """Minimal HTTP/1.1 keep-alive JSON client"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, payload: dict = None) -> tuple:
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            if key.lower() == 'content-length':
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+    async def timed(self, client: Client, method: str, path: str, payload: dict = None) -> dict:
+        start = time.perf_counter()
+        status, data = await client.request(method, path, payload)
+        self.latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            self.errors += 1
+        return data
+
+
+async def simulate_user(host: str, port: int, stats: Stats, answers: int, pool_size: int,
+                        mode: str, start_gate: asyncio.Event, rng: random.Random):
+    client = Client(host, port)
+    try:
+        await client.connect()
+        await start_gate.wait()
+        view = await stats.timed(client, 'POST', '/sessions', {
+            'name': 'loadtest', 'pool_size': pool_size, 'mode': mode, 'top_k': 10,
+        })
+        session = f"/sessions/{view['session_id']}"
+        taste = {}
+
+        for i in range(answers):
+            if view['done']:
+                break
+            if view['place']:
+                payload = {'tier': rng.choice('SABCD')}
+            else:
+                left, right = view['pair']
+                for song in (left, right):
+                    taste.setdefault(song['name'], rng.random())
+                payload = {'picked_left': taste[left['name']] > taste[right['name']]}
+            view = await stats.timed(client, 'POST', session + '/answer', payload)
+            if i % 5 == 4:
+                view = await stats.timed(client, 'GET', session)
+            if i == answers // 2:
+                view = await stats.timed(client, 'POST', session + '/undo')
+
+        await stats.timed(client, 'GET', session + '/ranking')
+        await stats.timed(client, 'GET', session + '/share')
+    except (ConnectionError, asyncio.IncompleteReadError, OSError):
+        stats.errors += 1
+    finally:
+        client.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(url: str, users: int, answers: int, pool_size: int, mode: str, seed: int) -> Stats:
+    parts = urlsplit(url)
+    stats = Stats()
+    start_gate = asyncio.Event()
+    rng = random.Random(seed)
+    tasks = [
+        asyncio.create_task(simulate_user(parts.hostname, parts.port or 80, stats, answers, pool_size,
+                                          mode, start_gate, random.Random(rng.random())))
+        for _ in range(users)
+    ]
+    # Let every user connect first so all of them are in flight at once
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def wait_for_server(url: str, timeout: float = 10):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+
+    async def probe():
+        client = Client(parts.hostname, parts.port or 80)
+        await client.connect()
+        await client.request('GET', '/health')
+        client.close()
+
+    while True:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Goose Ranker HTTP API")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--users', type=int, default=1000, help="Concurrent simulated users")
+    parser.add_argument('--answers', type=int, default=20, help="Answers per user")
+    parser.add_argument('--pool-size', type=int, default=50)
+    parser.add_argument('--mode', default='full', choices=['full', 'topk', 'tiers'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spawn', action='store_true', help="Start api.py on --url's port for the run")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        parts = urlsplit(args.url)
+        server = subprocess.Popen(
+            [sys.executable, 'api.py', '--host', parts.hostname, '--port', str(parts.port or 80)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        wait_for_server(args.url)
+        stats = asyncio.run(run(args.url, args.users, args.answers, args.pool_size, args.mode, args.seed))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    total = len(stats.latencies)
+    print(f"users={args.users} mode={args.mode} pool={args.pool_size} answers/user={args.answers}")
+    print(f"requests={total} errors={stats.errors} elapsed={stats.elapsed:.2f}s")
+    if total:
+        print(f"throughput={total / stats.elapsed:,.0f} req/s")
+        print(f"latency p50={percentile(stats.latencies, 50) * 1000:.1f}ms "
+              f"p99={percentile(stats.latencies, 99) * 1000:.1f}ms "
+              f"max={max(stats.latencies) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Throughput test for group ranking rooms - hundreds of members per room, one process.
+
+Every simulated member is a thread that votes on the room's current pair
+and then blocks on ``wait_for_round`` until the next pair is published.
+Members share the group's taste plus some personal noise, so majority
+voting should recover the shared order. Reports rounds and votes
+per second, how fast a new pair reaches every waiting member (fan-out
+latency) and how long a vote holds the room.
+
+Usage:
+    python loadtest_rooms.py --rooms 4 --members 300
+    python loadtest_rooms.py --members 500 --mode topk --voting weighted --quorum 0.6
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from catalog import load_catalog
+from pool_index import SongIndex, select_pool
+from rooms import ROOM_MODES, VOTING, RoomRegistry
+
+
+class Stats:
+    def __init__(self):
+        self.vote_latencies = []
+        self.wake_latencies = []
+        self.accepted = 0
+        self.stale = 0
+
+
+def simulate_member(room, stats: Stats, taste: dict, noise: float, rng: random.Random,
+                    start: threading.Barrier):
+    member_id = room.join(f"member-{rng.random():.6f}", weight=rng.randint(1, 3))
+    start.wait()
+    view = room.view
+    while not view.done:
+        left, right = view.pair
+        score_left = taste[left['name']] + rng.gauss(0, noise)
+        score_right = taste[right['name']] + rng.gauss(0, noise)
+
+        began = time.perf_counter()
+        accepted = room.vote(member_id, view.round, score_left > score_right)
+        stats.vote_latencies.append(time.perf_counter() - began)
+        if accepted:
+            stats.accepted += 1
+        else:
+            stats.stale += 1
+
+        latest = room.wait_for_round(view.round, timeout=5)
+        if latest.round != view.round:
+            stats.wake_latencies.append(time.monotonic() - latest.opened_at)
+        view = latest
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def agreement(ranked: list, taste: dict) -> float:
+    """Fraction of ranked pairs in the group's shared order"""
+    pairs = agree = 0
+    for i, higher in enumerate(ranked):
+        for lower in ranked[i + 1:]:
+            pairs += 1
+            agree += taste[higher['name']] > taste[lower['name']]
+    return agree / pairs if pairs else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput test for group ranking rooms")
+    parser.add_argument('--rooms', type=int, default=4)
+    parser.add_argument('--members', type=int, default=300, help="Members per room")
+    parser.add_argument('--pool-size', type=int, default=25)
+    parser.add_argument('--mode', default='full', choices=ROOM_MODES)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--voting', default='majority', choices=VOTING)
+    parser.add_argument('--quorum', type=float, default=0.5, help="Fraction of members that must vote")
+    parser.add_argument('--noise', type=float, default=0.1, help="Personal taste noise around the group's taste")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = select_pool(SongIndex(load_catalog('goose_songs.json')), {}, limit=args.pool_size)
+    registry = RoomRegistry()
+    stats = Stats()
+    start = threading.Barrier(args.rooms * args.members + 1)
+
+    rooms, tastes, threads = [], [], []
+    for r in range(args.rooms):
+        room = registry.create(f"room {r}", pool, mode=args.mode, top_k=args.top_k,
+                               voting=args.voting, quorum=args.quorum)
+        taste = {s['name']: rng.random() for s in pool}
+        rooms.append(room)
+        tastes.append(taste)
+        for _ in range(args.members):
+            threads.append(threading.Thread(
+                target=simulate_member,
+                args=(room, stats, taste, args.noise, random.Random(rng.random()), start),
+                daemon=True,
+            ))
+
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    rounds = sum(room.view.round for room in rooms)
+    votes = stats.accepted + stats.stale
+    print(f"rooms={args.rooms} members/room={args.members} mode={args.mode} pool={len(pool)} "
+          f"voting={args.voting} quorum={args.quorum} threads={len(threads)}")
+    print(f"rounds={rounds} votes={votes} (accepted {stats.accepted}, after close {stats.stale}) "
+          f"elapsed={elapsed:.2f}s")
+    print(f"throughput={rounds / elapsed:,.0f} rounds/s, {votes / elapsed:,.0f} votes/s")
+    if stats.wake_latencies:
+        print(f"fan-out latency p50={percentile(stats.wake_latencies, 50) * 1000:.1f}ms "
+              f"p99={percentile(stats.wake_latencies, 99) * 1000:.1f}ms")
+    print(f"vote latency p50={percentile(stats.vote_latencies, 50) * 1e6:.0f}us "
+          f"p99={percentile(stats.vote_latencies, 99) * 1e6:.0f}us")
+    for room, taste in zip(rooms, tastes):
+        print(f"  {room.name}: {room.view.comparisons} comparisons, "
+              f"{agreement(list(room.view.ranked), taste):.0%} of ranked pairs in the group's order")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Bitmap index over the song catalog for fast pool filtering.
+
+Songs are numbered by play-count rank (most played = bit 0), and every
+filterable column keeps one Python-int bitmap per value. Combining filters is
+then a handful of ``&``/``|`` operations, "Top N" is "lowest N set bits", and
+"at least K plays" is a prefix mask.
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import islice
+
+ORIGINS = ('original', 'side_project', 'cover')
+
+# Set bit positions of every byte value, for walking a bitmap byte by byte
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class SongIndex:
+    """Columnar bitmap index built once per catalog"""
+
+    def __init__(self, songs: list):
+        self._build(
+            names=[s['name'] for s in songs],
+            artists=[s['artist'] for s in songs],
+            origins=[s.get('origin', s['category']) for s in songs],
+            years=[song_debut_year(s) for s in songs],
+            plays=[s.get('times_played', 0) for s in songs],
+        )
+        self.songs = [songs[i] for i in self._order]
+
+    @classmethod
+    def from_columns(cls, song_at, names: list, artists: list, origins: list, years: list, plays: list):
+        """Build from column lists; ``song_at(i)`` materialises song i on demand"""
+        index = cls.__new__(cls)
+        index._build(names, artists, origins, years, plays)
+        index.songs = LazySongs(song_at, index._order)
+        return index
+
+    def _build(self, names: list, artists: list, origins: list, years: list, plays: list):
+        # Stable sort keeps catalog order for ties, like the original pool sort
+        self._order = sorted(range(len(names)), key=plays.__getitem__, reverse=True)
+        self.names = [names[i] for i in self._order]
+        self.all_mask = (1 << len(names)) - 1
+        # Collect set bits per key, then build each bitmap once - OR-ing into a
+        # growing int per song is quadratic in catalog size
+        artist_bits, origin_bits, year_bits = {}, {}, {}
+        self.bit_of = {}
+        for bit, i in enumerate(self._order):
+            self.bit_of[names[i]] = bit
+            artist_bits.setdefault(artists[i], []).append(bit)
+            origin_bits.setdefault(origins[i], []).append(bit)
+            if years[i] is not None:
+                year_bits.setdefault(years[i], []).append(bit)
+
+        self.by_artist = {artist: _mask_of_bits(bits) for artist, bits in artist_bits.items()}
+        self.by_origin = {origin: 0 for origin in ORIGINS}
+        self.by_origin.update((origin, _mask_of_bits(bits)) for origin, bits in origin_bits.items())
+        self.by_year = {year: _mask_of_bits(bits) for year, bits in year_bits.items()}
+
+        # Play counts ascending (negated rank order) for min-plays prefix lookups
+        self._neg_plays = [-plays[i] for i in self._order]
+
+    @property
+    def artists(self) -> list:
+        """Artists ordered by how many songs they have in the catalog"""
+        return sorted(self.by_artist, key=lambda a: (-self.by_artist[a].bit_count(), a))
+
+    @property
+    def year_range(self) -> tuple:
+        """(first, last) debut year in the catalog"""
+        if not self.by_year:
+            return None, None
+        return min(self.by_year), max(self.by_year)
+
+    def select(self, artists=None, origins=None, years=None, min_plays: int = 0) -> int:
+        """Bitmap of songs matching every given filter (None = no filter)"""
+        mask = self.all_mask
+        if artists:
+            mask &= _union(self.by_artist.get(a, 0) for a in artists)
+        if origins is not None:
+            mask &= _union(self.by_origin.get(o, 0) for o in origins)
+        if years:
+            lo, hi = years
+            mask &= _union(bits for year, bits in self.by_year.items() if lo <= year <= hi)
+        if min_plays:
+            # Songs are in descending play order, so this is a prefix
+            mask &= (1 << bisect_right(self._neg_plays, -min_plays)) - 1
+        return mask
+
+    def mask_of(self, songs: list) -> int:
+        """Bitmap of the given songs"""
+        return _mask_of_bits(sorted(self.bit_of[song['name']] for song in songs))
+
+    def top(self, mask: int, limit: int = None) -> list:
+        """Songs in ``mask``, most played first, capped at ``limit``"""
+        return [self.songs[bit] for bit in islice(_set_bits(mask), limit)]
+
+    def first(self, mask: int, limit: int = None) -> int:
+        """``mask`` cut down to its ``limit`` most played songs"""
+        if limit is None or mask.bit_count() <= limit:
+            return mask
+        if limit <= 0:
+            return 0
+        last = next(islice(_set_bits(mask), limit - 1, None))
+        return mask & ((1 << (last + 1)) - 1)
+
+
+class LazySongs(Sequence):
+    """Songs in index order, built by ``song_at`` the first time they're used"""
+
+    def __init__(self, song_at, order: list):
+        self._song_at = song_at
+        self._order = order
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        song = self._cache.get(position)
+        if song is None:
+            song = self._cache[position] = self._song_at(self._order[position])
+        return song
+
+
+def _mask_of_bits(bits: list) -> int:
+    """Bitmap with ``bits`` (ascending) set"""
+    if len(bits) < 16:
+        return sum(1 << bit for bit in bits)
+    buf = bytearray(bits[-1] // 8 + 1)
+    for bit in bits:
+        buf[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _set_bits(mask: int):
+    """Positions of the set bits in ``mask``, ascending - linear in its size"""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for offset, value in enumerate(data):
+        if value:
+            base = offset * 8
+            for bit in _BYTE_BITS[value]:
+                yield base + bit
+
+
+def _union(bitmaps) -> int:
+    mask = 0
+    for bits in bitmaps:
+        mask |= bits
+    return mask
+
+
+def song_debut_year(song: dict):
+    """Year from ``first_played`` (YYYY-MM-DD), or None"""
+    first_played = song.get('first_played') or ''
+    return int(first_played[:4]) if first_played[:4].isdigit() else None
+
+
+def select_pool(index: SongIndex, filters: dict, include_covers: bool = True, limit: int = None) -> list:
+    """Apply setup-screen filters and return the pool, most played first"""
+    return index.top(select_mask(index, filters, include_covers), limit)
+
+
+def select_mask(index: SongIndex, filters: dict, include_covers: bool = True, limit: int = None) -> int:
+    """Bitmap of the pool ``select_pool`` would return - for counts without building it"""
+    origins = list(filters.get('origins') or ('original', 'side_project', 'cover'))
+    if not include_covers and 'cover' in origins:
+        origins.remove('cover')
+    mask = index.select(
+        artists=filters.get('artists'),
+        origins=origins,
+        years=filters.get('years'),
+        min_plays=filters.get('min_plays', 0),
+    )
+    return index.first(mask, limit)
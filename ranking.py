@@ -0,0 +1,492 @@
+"""Pure ranking engine - binary insertion over plain state dicts.
+
+Every function here takes a state dict (the same keys the Streamlit app keeps
+in ``st.session_state``) and returns a *new* dict, so states can be
+precomputed, stored in history, or shared across threads without copying
+Streamlit's session object.
+
+Three modes are supported:
+
+- ``'full'`` binary-inserts every song of the pool into ``ranked_songs``
+  (~n log n comparisons).
+- ``'topk'`` runs a knockout tournament and only extracts the best ``top_k``
+  songs (~n + k log n comparisons). Match results are memoised, so finding
+  the next-best song only replays the matches on the previous winner's path.
+- ``'tiers'`` buckets every song into a tier with one multi-way choice, then
+  sorts a tier only when the user opens it. Each tier keeps its own sorted
+  and unsorted lists, so a tier can be refined later without touching others.
+"""
+
+import base64
+import json
+
+STATE_KEYS = (
+    'ranked_songs',
+    'unranked_songs',
+    'current_song',
+    'comparison_left',
+    'comparison_right',
+    'ranking_in_progress',
+    'total_comparisons',
+    'songs_ranked_count',
+    'initial_matchup',
+    'song_a',
+    'song_b',
+    'ranking_mode',
+    'top_k',
+    'tournament',
+    'tiers',
+    'active_tier',
+)
+
+TIERS = ('S', 'A', 'B', 'C', 'D')
+
+
+def new_state(pool: list, mode: str = 'full', top_k: int = None) -> dict:
+    """Create a fresh ranking state for a pool (most played first)"""
+    if mode == 'topk' and (top_k is None or top_k < 1):
+        raise ValueError("'topk' mode needs top_k of at least 1")
+    # Asking for all (or all but one) of the pool costs more as a tournament
+    # than as a full ranking, so that case falls through to 'full'
+    if mode == 'topk' and top_k < len(pool) - 1:
+        return new_topk_state(pool, top_k)
+    if mode == 'tiers':
+        return new_tier_state(pool)
+    state = {
+        'ranked_songs': [],
+        'unranked_songs': list(pool),
+        'current_song': None,
+        'comparison_left': 0,
+        'comparison_right': 0,
+        'ranking_in_progress': False,
+        'total_comparisons': 0,
+        'songs_ranked_count': 0,
+        'initial_matchup': True,
+        'song_a': None,
+        'song_b': None,
+        'ranking_mode': 'full',
+        'top_k': None,
+        'tournament': None,
+        'tiers': None,
+        'active_tier': None,
+    }
+    if len(pool) >= 2:
+        state['song_a'] = pool[0]
+        state['song_b'] = pool[1]
+    elif pool:
+        # A lone song is already ranked
+        state.update({'ranked_songs': list(pool), 'unranked_songs': [],
+                      'initial_matchup': False, 'songs_ranked_count': 1})
+    return state
+
+
+def snapshot(source) -> dict:
+    """Copy the ranking keys out of a dict-like (e.g. st.session_state)"""
+    state = {key: source[key] for key in STATE_KEYS}
+    state['ranked_songs'] = list(state['ranked_songs'])
+    state['unranked_songs'] = list(state['unranked_songs'])
+    if state['tournament'] is not None:
+        state['tournament'] = {
+            'pool': state['tournament']['pool'],
+            'results': dict(state['tournament']['results']),
+        }
+    if state['tiers'] is not None:
+        state['tiers'] = {
+            tier: {'ranked': list(entry['ranked']), 'unsorted': list(entry['unsorted']), 'search': entry['search']}
+            for tier, entry in state['tiers'].items()
+        }
+    return state
+
+
+def start_ranking_song(state: dict, song: dict) -> dict:
+    """Start ranking a new song using binary search"""
+    state = dict(state)
+    state['current_song'] = song
+    if state['ranking_mode'] == 'tiers':
+        # Tier placement is a single choice - no search window
+        return state
+    state['ranking_in_progress'] = True
+    state['comparison_left'] = 0
+    state['comparison_right'] = len(state['ranked_songs']) - 1
+    return state
+
+
+def _start_next_song(state: dict) -> dict:
+    """Auto-start next song if available"""
+    if state['unranked_songs']:
+        return start_ranking_song(state, state['unranked_songs'][0])
+    return state
+
+
+def apply_initial_choice(state: dict, chose_a: bool) -> dict:
+    """Resolve the initial head-to-head matchup"""
+    state = snapshot(state)
+    song_a, song_b = state['song_a'], state['song_b']
+
+    state['total_comparisons'] += 1
+    state['ranked_songs'] = [song_a, song_b] if chose_a else [song_b, song_a]
+
+    # Remove both from unranked
+    state['unranked_songs'].remove(song_a)
+    state['unranked_songs'].remove(song_b)
+
+    # Clear initial matchup state
+    state['initial_matchup'] = False
+    state['song_a'] = None
+    state['song_b'] = None
+    state['songs_ranked_count'] = 2
+
+    return _start_next_song(state)
+
+
+def apply_swipe(state: dict, is_better: bool) -> dict:
+    """Apply one binary-search step - True if current song is better"""
+    state = snapshot(state)
+    mid = (state['comparison_left'] + state['comparison_right']) // 2
+
+    state['total_comparisons'] += 1
+
+    if is_better:
+        # Current song is better, search upper half (lower indices)
+        state['comparison_right'] = mid - 1
+    else:
+        # Comparison song is better, search lower half
+        state['comparison_left'] = mid + 1
+
+    # Check if search is complete
+    if state['comparison_left'] > state['comparison_right']:
+        state['ranked_songs'].insert(state['comparison_left'], state['current_song'])
+        state['unranked_songs'].remove(state['current_song'])
+        state['current_song'] = None
+        state['ranking_in_progress'] = False
+        state['songs_ranked_count'] += 1
+        state = _start_next_song(state)
+
+    return state
+
+
+def skip_song(state: dict) -> dict:
+    """Move the current song to the end of the unranked list"""
+    if not state['current_song']:
+        return state
+    state = snapshot(state)
+    state['unranked_songs'].remove(state['current_song'])
+    state['unranked_songs'].append(state['current_song'])
+    state['current_song'] = None
+    state['ranking_in_progress'] = False
+    return _start_next_song(state)
+
+
+def pick_song(state: dict, song: dict) -> dict:
+    """Move a song to the front of the queue and start ranking it"""
+    state = snapshot(state)
+    state['unranked_songs'].remove(song)
+    state['unranked_songs'].insert(0, song)
+    return start_ranking_song(state, song)
+
+
+def comparison_song(state: dict) -> dict:
+    """Get the ranked song the current song is compared against"""
+    mid = (state['comparison_left'] + state['comparison_right']) // 2
+    return state['ranked_songs'][mid]
+
+
+def current_pair(state: dict):
+    """Return the (left, right) pair on screen, or None when nothing to ask"""
+    if state['ranking_mode'] == 'topk':
+        if state['ranking_in_progress']:
+            return state['song_a'], state['song_b']
+        return None
+    if state['ranking_mode'] == 'tiers':
+        if state['active_tier']:
+            return current_pair(state['tiers'][state['active_tier']]['search'])
+        return None
+    if state['initial_matchup'] and state['song_a'] and state['song_b']:
+        return state['song_a'], state['song_b']
+    if state['ranking_in_progress'] and state['current_song']:
+        return comparison_song(state), state['current_song']
+    return None
+
+
+def answer(state: dict, picked_left: bool) -> dict:
+    """Apply the user's pick for the pair returned by ``current_pair``.
+
+    The initial matchup shows song A on the left; binary search shows the
+    comparison song on the left and the song being ranked on the right.
+    """
+    if state['ranking_mode'] == 'topk':
+        return apply_match_result(state, picked_left)
+    if state['ranking_mode'] == 'tiers':
+        return apply_tier_answer(state, picked_left)
+    if state['initial_matchup']:
+        return apply_initial_choice(state, chose_a=picked_left)
+    return apply_swipe(state, is_better=not picked_left)
+
+
+def precompute_next_states(state: dict, render=None) -> dict:
+    """Speculatively compute both possible outcomes of the next click.
+
+    Returns ``{True: ..., False: ...}`` keyed by ``picked_left``; each entry
+    holds the next ``state``, its ``pair`` and, if ``render`` is given,
+    ``render(pair)`` so the UI can show the following cards without
+    redoing any work after the click.
+    """
+    outcomes = {}
+    if current_pair(state) is None:
+        return outcomes
+    for picked_left in (True, False):
+        next_state = answer(state, picked_left)
+        pair = current_pair(next_state)
+        outcomes[picked_left] = {
+            'state': next_state,
+            'pair': pair,
+            'html': render(pair) if render and pair else None,
+        }
+    return outcomes
+
+
+class _NeedMatch(Exception):
+    """Raised inside the tournament when a match has not been played yet"""
+
+    def __init__(self, song_a: dict, song_b: dict):
+        super().__init__(song_a['name'], song_b['name'])
+        self.song_a = song_a
+        self.song_b = song_b
+
+
+def _match_key(song_a: dict, song_b: dict) -> str:
+    return song_a['name'] + '\x00' + song_b['name']
+
+
+def _tournament_winner(pool: list, lo: int, hi: int, removed: set, results: dict):
+    """Winner of the knockout bracket over ``pool[lo:hi]`` ignoring removed songs"""
+    if hi - lo == 1:
+        return None if pool[lo]['name'] in removed else pool[lo]
+    mid = (lo + hi) // 2
+    song_a = _tournament_winner(pool, lo, mid, removed, results)
+    song_b = _tournament_winner(pool, mid, hi, removed, results)
+    if song_a is None or song_b is None:
+        return song_a or song_b
+    winner = results.get(_match_key(song_a, song_b))
+    if winner is None:
+        raise _NeedMatch(song_a, song_b)
+    return song_a if winner == song_a['name'] else song_b
+
+
+def new_topk_state(pool: list, top_k: int) -> dict:
+    """Create a fresh "Find my Top K" state for a pool"""
+    state = {
+        'ranked_songs': [],
+        'unranked_songs': list(pool),
+        'current_song': None,
+        'comparison_left': 0,
+        'comparison_right': 0,
+        'ranking_in_progress': False,
+        'total_comparisons': 0,
+        'songs_ranked_count': 0,
+        'initial_matchup': False,
+        'song_a': None,
+        'song_b': None,
+        'ranking_mode': 'topk',
+        'top_k': min(top_k, len(pool)),
+        'tournament': {'pool': list(pool), 'results': {}},
+        'tiers': None,
+        'active_tier': None,
+    }
+    return _advance_topk(state)
+
+
+def _advance_topk(state: dict) -> dict:
+    """Extract winners until the top K are found or a new match is needed"""
+    pool = state['tournament']['pool']
+    results = state['tournament']['results']
+    found = list(state['ranked_songs'])
+    removed = {s['name'] for s in found}
+
+    state['ranking_in_progress'] = False
+    state['song_a'] = None
+    state['song_b'] = None
+    while len(found) < state['top_k']:
+        try:
+            winner = _tournament_winner(pool, 0, len(pool), removed, results)
+        except _NeedMatch as match:
+            state['song_a'] = match.song_a
+            state['song_b'] = match.song_b
+            state['ranking_in_progress'] = True
+            break
+        found.append(winner)
+        removed.add(winner['name'])
+
+    state['ranked_songs'] = found
+    state['unranked_songs'] = [s for s in pool if s['name'] not in removed]
+    state['songs_ranked_count'] = len(found)
+    return state
+
+
+def apply_match_result(state: dict, picked_left: bool) -> dict:
+    """Record the result of the pending tournament match"""
+    state = snapshot(state)
+    winner = state['song_a'] if picked_left else state['song_b']
+    state['tournament']['results'][_match_key(state['song_a'], state['song_b'])] = winner['name']
+    state['total_comparisons'] += 1
+    return _advance_topk(state)
+
+
+def simulate_comparisons(pool: list, prefers, mode: str = 'full', top_k: int = None) -> tuple:
+    """Run a whole session against ``prefers(left, right) -> picked_left``.
+
+    Returns ``(comparisons, ranked_songs)``; used to size pool presets.
+    """
+    state = new_state(pool, mode, top_k)
+    while (pair := current_pair(state)) is not None:
+        state = answer(state, prefers(*pair))
+    return state['total_comparisons'], state['ranked_songs']
+
+
+def new_tier_state(pool: list) -> dict:
+    """Create a fresh tier-list state - every song starts unplaced"""
+    state = new_state(pool)
+    state.update({
+        'ranked_songs': [],
+        'unranked_songs': list(pool),
+        'songs_ranked_count': 0,
+        'initial_matchup': False,
+        'song_a': None,
+        'song_b': None,
+        'ranking_mode': 'tiers',
+        'tiers': {tier: {'ranked': [], 'unsorted': [], 'search': None} for tier in TIERS},
+        'active_tier': None,
+    })
+    return _start_next_song(state)
+
+
+def _tier_order(state: dict) -> list:
+    """Flatten tiers into one list: tier order, sorted songs before unsorted"""
+    songs = []
+    for tier in TIERS:
+        entry = state['tiers'][tier]
+        songs.extend(entry['ranked'])
+        songs.extend(entry['unsorted'])
+    return songs
+
+
+def assign_tier(state: dict, tier: str) -> dict:
+    """Place the current song into a tier (one interaction per song)"""
+    state = snapshot(state)
+    song = state['current_song']
+    entry = state['tiers'][tier]
+    entry['unsorted'].append(song)
+    if entry['search'] is not None:
+        # Tier was partly sorted - queue the song behind the paused search
+        entry['search'] = dict(entry['search'], unranked_songs=entry['search']['unranked_songs'] + [song])
+    state['unranked_songs'].remove(song)
+    state['current_song'] = None
+    state['total_comparisons'] += 1
+    state['songs_ranked_count'] += 1
+    state['ranked_songs'] = _tier_order(state)
+    return _start_next_song(state)
+
+
+def _sync_tier_search(state: dict, tier: str) -> dict:
+    """Copy a tier's binary-insertion progress back into the tier entry"""
+    entry = state['tiers'][tier]
+    search = entry['search']
+    entry['ranked'] = list(search['ranked_songs'])
+    entry['unsorted'] = list(search['unranked_songs'])
+    if current_pair(search) is None:
+        entry['search'] = None
+        state['active_tier'] = None
+    state['ranked_songs'] = _tier_order(state)
+    return state
+
+
+def open_tier(state: dict, tier: str) -> dict:
+    """Start (or resume) sorting one tier; only its unsorted songs are inserted"""
+    state = snapshot(state)
+    entry = state['tiers'][tier]
+    if entry['search'] is None:
+        if entry['ranked']:
+            search = new_state([])
+            search.update({'ranked_songs': list(entry['ranked']), 'unranked_songs': list(entry['unsorted']),
+                           'initial_matchup': False, 'songs_ranked_count': len(entry['ranked'])})
+            search = _start_next_song(search)
+        else:
+            search = new_state(entry['unsorted'])
+        entry['search'] = search
+    state['active_tier'] = tier
+    return _sync_tier_search(state, tier)
+
+
+def close_tier(state: dict) -> dict:
+    """Stop sorting the active tier, keeping the order found so far"""
+    state = snapshot(state)
+    state['active_tier'] = None
+    return state
+
+
+def apply_tier_answer(state: dict, picked_left: bool) -> dict:
+    """Apply a pick while sorting the active tier"""
+    state = snapshot(state)
+    tier = state['active_tier']
+    entry = state['tiers'][tier]
+    entry['search'] = answer(entry['search'], picked_left)
+    state['total_comparisons'] += 1
+    return _sync_tier_search(state, tier)
+
+
+def tier_scores(state: dict) -> list:
+    """Beli scores from tier plus within-tier rank.
+
+    Each tier owns an equal slice of the 0-10 scale (S = 10.0 down to 8.0
+    with five tiers). Sorted songs step evenly down their slice; songs not
+    yet sorted share the average of the positions left over.
+    Returns ``(song, tier, score)`` tuples in ranked order.
+    """
+    width = 10 / len(TIERS)
+    scored = []
+    for i, tier in enumerate(TIERS):
+        entry = state['tiers'][tier]
+        top = 10 - i * width
+        size = len(entry['ranked']) + len(entry['unsorted'])
+        step = width / max(size, 1)
+        for pos, song in enumerate(entry['ranked']):
+            scored.append((song, tier, round(top - pos * step, 1)))
+        if entry['unsorted']:
+            middle = (len(entry['ranked']) + size - 1) / 2
+            for song in entry['unsorted']:
+                scored.append((song, tier, round(top - middle * step, 1)))
+    return scored
+
+
+def get_beli_score(position: int, total: int) -> float:
+    """Calculate Beli-style score (0-10) based on position"""
+    if total <= 1:
+        return 10.0
+    return round(10 - ((position - 1) / (total - 1)) * 10, 1)
+
+
+def encode_rankings(name: str, rankings: list) -> str:
+    """Encode rankings to shareable string"""
+    data = {
+        'n': name,
+        'r': [s['name'] for s in rankings]
+    }
+    json_str = json.dumps(data, separators=(',', ':'))
+    return base64.urlsafe_b64encode(json_str.encode()).decode()
+
+
+def decode_rankings(code: str, all_songs: list) -> tuple:
+    """Decode rankings from shared code"""
+    try:
+        json_str = base64.urlsafe_b64decode(code.encode()).decode()
+        data = json.loads(json_str)
+        name = data['n']
+        song_names = data['r']
+        
+        # Rebuild song objects
+        song_dict = {s['name']: s for s in all_songs}
+        rankings = [song_dict[n] for n in song_names if n in song_dict]
+        
+        return name, rankings
+    except:
+        return None, None
@@ -0,0 +1,284 @@
+"""Live group ranking rooms shared by every session in the process.
+
+A room holds one ranking state that a group answers together. Every member
+is asked the same pair each round; votes are tallied (one member one vote,
+or by member weight) and once a quorum of members has voted the winning
+side is applied with ``ranking.answer`` and the next pair is published.
+
+Readers never take the lock: each round is published as an immutable
+``RoomView`` swapped in with a single attribute assignment, so any number of
+sessions can poll a room at once. The lock is only held to record a vote
+and, when that vote completes the quorum, to advance the state. Members
+waiting for the next pair block on a ``Condition`` and are all woken by one
+``notify_all`` when it is published.
+"""
+
+import math
+import secrets
+import threading
+import time
+from typing import NamedTuple
+
+import ranking
+
+VOTING = ('majority', 'weighted')
+ROOM_MODES = ('full', 'topk')
+ROOM_TTL = 6 * 60 * 60
+MEMBER_TTL = 10 * 60        # members idle this long stop counting toward the quorum
+SWEEP_INTERVAL = 30         # how often votes and renders look for idle members
+CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+CODE_LENGTH = 5
+
+
+class RoomView(NamedTuple):
+    """What every member sees for one round"""
+    round: int
+    pair: tuple             # (left, right) songs, or None once the room is done
+    ranked: tuple           # the room's ranked songs so far
+    remaining: int
+    comparisons: int
+    last_result: tuple      # (winner name, loser name, winner votes, loser votes) of the previous round
+    opened_at: float        # time.monotonic() when the round was published
+    done: bool
+
+
+class Member:
+    __slots__ = ('name', 'weight', 'last_seen')
+
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = weight
+        self.last_seen = time.monotonic()
+
+
+class Room:
+    """One shared ranking answered by many members"""
+
+    def __init__(self, code: str, name: str, pool: list, mode: str = 'full', top_k: int = None,
+                 voting: str = 'majority', quorum: float = 0.5):
+        if mode not in ROOM_MODES:
+            raise ValueError(f"rooms rank pairwise - mode must be one of {', '.join(ROOM_MODES)}")
+        if voting not in VOTING:
+            raise ValueError(f"voting must be one of {', '.join(VOTING)}")
+        if not 0 < quorum <= 1:
+            raise ValueError("quorum must be a fraction in (0, 1]")
+        self.code = code
+        self.name = name
+        self.voting = voting
+        self.quorum = quorum
+        self.host = None
+        self.last_activity = self._last_sweep = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._members = {}
+        self._votes = {}
+        self._tally = [0, 0]        # weight for (left, right) this round
+        self._first_pick = None     # breaks ties once everyone has voted
+        self._rendered = None       # (round, value) cached by rendered()
+
+        self.state = ranking.new_state(pool, mode, top_k)
+        self.view = None
+        self._publish(0, None)
+
+    def _publish(self, round_number: int, last_result):
+        state = self.state
+        pair = ranking.current_pair(state)
+        self.view = RoomView(
+            round=round_number,
+            pair=pair,
+            ranked=tuple(state['ranked_songs']),
+            remaining=len(state['unranked_songs']),
+            comparisons=state['total_comparisons'],
+            last_result=last_result,
+            opened_at=time.monotonic(),
+            done=pair is None,
+        )
+
+    # Membership
+
+    def join(self, name: str, weight: int = 1) -> str:
+        """Add a member; returns their id. The first member becomes the host."""
+        member_id = secrets.token_urlsafe(8)
+        with self._lock:
+            self._members[member_id] = Member(name, max(1, int(weight)))
+            if self.host is None:
+                self.host = member_id
+        return member_id
+
+    def leave(self, member_id: str):
+        with self._lock:
+            self._drop(member_id)
+            self._maybe_close_round()
+
+    def _drop(self, member_id: str):
+        if member_id not in self._members:
+            return
+        if member_id in self._votes:
+            self._count(member_id, -1)
+            del self._votes[member_id]
+        del self._members[member_id]
+        if self.host == member_id:
+            self.host = next(iter(self._members), None)
+
+    def touch(self, member_id: str) -> bool:
+        """Mark a member as active (lock-free); False if they're not in the room"""
+        member = self._members.get(member_id)
+        if member is None:
+            return False
+        member.last_seen = time.monotonic()
+        return True
+
+    def sweep(self, now: float = None) -> int:
+        """Drop members idle for longer than MEMBER_TTL; returns how many left"""
+        with self._lock:
+            return self._sweep(now or time.monotonic())
+
+    def maybe_sweep(self) -> int:
+        """``sweep()`` at most once per SWEEP_INTERVAL - cheap to call on every render"""
+        if time.monotonic() - self._last_sweep < SWEEP_INTERVAL:
+            return 0
+        return self.sweep()
+
+    def _sweep(self, now: float) -> int:
+        self._last_sweep = now
+        idle = [m for m, member in self._members.items() if now - member.last_seen > MEMBER_TTL]
+        for member_id in idle:
+            self._drop(member_id)
+        if idle:
+            self._maybe_close_round()
+        return len(idle)
+
+    def members(self) -> list:
+        """Member names, host first"""
+        members = dict(self._members)
+        return sorted((member.name for member in members.values()),
+                      key=lambda name: name != getattr(members.get(self.host), 'name', None))
+
+    # Voting
+
+    def _count(self, member_id: str, sign: int):
+        """Add (sign=1) or remove (sign=-1) a member's current vote from the tally"""
+        weight = self._members[member_id].weight if self.voting == 'weighted' else 1
+        self._tally[0 if self._votes[member_id] else 1] += sign * weight
+
+    def votes_needed(self) -> int:
+        return max(1, math.ceil(self.quorum * len(self._members)))
+
+    def progress(self) -> tuple:
+        """(votes cast, votes needed) for the current round - lock-free, may be a moment stale"""
+        return len(self._votes), self.votes_needed()
+
+    def vote(self, member_id: str, round_number: int, picked_left: bool) -> bool:
+        """Record a vote for ``round_number``; False if the round already closed.
+
+        A member may change their vote until the round closes.
+        """
+        with self._lock:
+            member = self._members.get(member_id)
+            if member is None:
+                raise KeyError("not a member of this room")
+            if round_number != self.view.round or self.view.done:
+                return False
+            now = member.last_seen = self.last_activity = time.monotonic()
+
+            if member_id in self._votes:
+                self._count(member_id, -1)
+            self._votes[member_id] = picked_left
+            self._count(member_id, 1)
+            if self._first_pick is None:
+                self._first_pick = picked_left
+            # Idle members (e.g. a host who closed the tab) would otherwise
+            # count toward the quorum forever and stall tied rounds
+            if now - self._last_sweep >= SWEEP_INTERVAL:
+                self._sweep(now)
+            self._maybe_close_round()
+        return True
+
+    def close_round(self, member_id: str) -> bool:
+        """Let the host close the round early with the votes cast so far"""
+        with self._lock:
+            if member_id != self.host or not self._votes or self.view.done:
+                return False
+            self._close_round()
+        return True
+
+    def _maybe_close_round(self):
+        if self.view.done or len(self._votes) < self.votes_needed():
+            return
+        left, right = self._tally
+        # A tie waits for more votes, unless everyone has already voted
+        if left == right and len(self._votes) < len(self._members):
+            return
+        self._close_round()
+
+    def _close_round(self):
+        left, right = self._tally
+        picked_left = self._first_pick if left == right else left > right
+        song_left, song_right = self.view.pair
+        if picked_left:
+            result = (song_left['name'], song_right['name'], left, right)
+        else:
+            result = (song_right['name'], song_left['name'], right, left)
+        self.state = ranking.answer(self.state, picked_left)
+        self._votes = {}
+        self._tally = [0, 0]
+        self._first_pick = None
+        self._publish(self.view.round + 1, result)
+        self._published.notify_all()
+
+    # Fan-out
+
+    def wait_for_round(self, after_round: int, timeout: float = None) -> RoomView:
+        """Block until a round later than ``after_round`` is published (or timeout)"""
+        view = self.view
+        if view.round != after_round or view.done:
+            return view
+        with self._lock:
+            self._published.wait_for(lambda: self.view.round != after_round, timeout)
+            return self.view
+
+    def rendered(self, view: RoomView, render) -> object:
+        """``render(view)`` computed once per round and shared by every member.
+
+        Pass the view the caller is already showing, so the render always
+        matches it even if the round closes in between.
+        """
+        cached = self._rendered
+        if cached is not None and cached[0] == view.round:
+            return cached[1]
+        value = render(view)
+        if cached is None or cached[0] < view.round:
+            self._rendered = (view.round, value)
+        return value
+
+
+class RoomRegistry:
+    """All rooms in the process, keyed by a short join code"""
+
+    def __init__(self, ttl: float = ROOM_TTL):
+        self.ttl = ttl
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def create(self, name: str, pool: list, **options) -> Room:
+        with self._lock:
+            self._sweep()
+            while True:
+                code = ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+                if code not in self._rooms:
+                    break
+            room = self._rooms[code] = Room(code, name, pool, **options)
+        return room
+
+    def get(self, code: str):
+        """The room for a join code (case-insensitive), or None"""
+        return self._rooms.get((code or '').strip().upper())
+
+    def _sweep(self):
+        now = time.monotonic()
+        for code in [c for c, room in self._rooms.items() if now - room.last_activity > self.ttl]:
+            del self._rooms[code]
+
+    def __len__(self):
+        return len(self._rooms)
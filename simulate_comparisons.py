@@ -0,0 +1,68 @@
+"""Report how many comparisons each ranking mode needs per pool preset.
+
+Simulates users with random (but consistent) taste against the real catalog
+and averages the click count over several trials.
+
+Usage:
+    python simulate_comparisons.py [--trials 20] [--k 10 25]
+"""
+
+import argparse
+import json
+import random
+
+import ranking
+
+# Mirrors POOL_PRESETS in app.py (None = all songs)
+PRESETS = {
+    "Top 25": 25,
+    "Top 50": 50,
+    "Top 100": 100,
+    "Top 150": 150,
+    "All Songs": None,
+}
+
+
+def load_pool() -> list:
+    with open('goose_songs.json', 'r') as f:
+        songs = json.load(f)['songs']
+    return sorted(songs, key=lambda s: s.get('times_played', 0), reverse=True)
+
+
+def average_comparisons(pool: list, trials: int, mode: str, top_k: int = None, seed: int = 0) -> float:
+    """Mean comparisons over ``trials`` simulated users"""
+    rng = random.Random(seed)
+    total = 0
+    for _ in range(trials):
+        taste = {s['name']: rng.random() for s in pool}
+        comparisons, ranked = ranking.simulate_comparisons(
+            pool, lambda a, b: taste[a['name']] > taste[b['name']], mode, top_k
+        )
+        expected = sorted(pool, key=lambda s: taste[s['name']], reverse=True)[:len(ranked)]
+        assert ranked == expected, "simulated ranking doesn't match the user's taste"
+        total += comparisons
+    return total / trials
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--k', type=int, nargs='+', default=[10, 25])
+    args = parser.parse_args()
+
+    songs = load_pool()
+    header = f"| {'Preset':<9} | {'Songs':>5} | {'Full':>6} |" + "".join(f" {'Top ' + str(k):>7} |" for k in args.k)
+    print(header)
+    print("|" + "|".join("-" * len(col) for col in header.split('|')[1:-1]) + "|")
+    for preset, limit in PRESETS.items():
+        pool = songs[:limit] if limit else songs
+        full = average_comparisons(pool, args.trials, 'full')
+        row = f"| {preset:<9} | {len(pool):>5} | {full:>6.0f} |"
+        for k in args.k:
+            topk = average_comparisons(pool, args.trials, 'topk', k)
+            row += f" {topk:>7.0f} |"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Tests for the headless API's routes and error codes.
+
+Run with ``python -m pytest -q``.
+"""
+
+import json
+
+import pytest
+
+from api import MemoryCache, RankingAPI, SessionStore
+from catalog import load_catalog
+
+
+@pytest.fixture(scope='module')
+def songs():
+    return load_catalog('goose_songs.json')
+
+
+@pytest.fixture
+def api(songs):
+    return RankingAPI(songs, SessionStore(MemoryCache()))
+
+
+def call(api: RankingAPI, method: str, path: str, body=None) -> tuple:
+    return api.dispatch(method, path, json.dumps(body).encode() if body is not None else b'')
+
+
+def start(api: RankingAPI, **options) -> dict:
+    status, view = call(api, 'POST', '/sessions', {'name': 'Tester', 'pool_size': 5, **options})
+    assert status == 201
+    return view
+
+
+def test_full_session_from_start_to_share(api, songs):
+    view = start(api)
+    path = f"/sessions/{view['session_id']}"
+    assert view['mode'] == 'full' and len(view['pair']) == 2 and not view['done']
+
+    assert call(api, 'GET', path)[1] == view
+    while not view['done']:
+        status, view = call(api, 'POST', path + '/answer', {'picked_left': True})
+        assert status == 200
+    assert view['ranked'] == 5 and view['can_undo']
+
+    status, result = call(api, 'GET', path + '/ranking')
+    assert status == 200 and [row['score'] for row in result['ranking']] == sorted(
+        (row['score'] for row in result['ranking']), reverse=True)
+
+    status, shared = call(api, 'GET', path + '/share')
+    status, decoded = call(api, 'POST', '/share/decode', shared)
+    assert status == 200 and decoded['name'] == 'Tester'
+    assert [s['name'] for s in decoded['ranking']] == [row['song']['name'] for row in result['ranking']]
+
+
+def test_skip_and_undo(api):
+    view = start(api)
+    path = f"/sessions/{view['session_id']}"
+    assert call(api, 'POST', path + '/undo') == (409, {'error': "nothing to undo"})
+
+    status, answered = call(api, 'POST', path + '/answer', {'picked_left': False})
+    status, undone = call(api, 'POST', path + '/undo')
+    assert status == 200 and undone['pair'] == view['pair'] and not undone['can_undo']
+
+    # Skipping sends the song being placed to the back of the queue
+    status, answered = call(api, 'POST', path + '/answer', {'picked_left': True})
+    status, skipped = call(api, 'POST', path + '/skip')
+    assert status == 200 and skipped['remaining'] == answered['remaining']
+    assert skipped['pair'] != answered['pair']
+
+
+def test_tier_session(api):
+    view = start(api, mode='tiers')
+    path = f"/sessions/{view['session_id']}"
+    assert view['place'] is not None and view['pair'] is None
+
+    assert call(api, 'POST', path + '/answer', {'tier': 'Z'})[0] == 400
+    assert call(api, 'POST', path + '/tiers/Z/open')[0] == 400
+    for _ in range(5):
+        status, view = call(api, 'POST', path + '/answer', {'tier': 'A'})
+    assert view['done'] and call(api, 'POST', path + '/answer', {'tier': 'A'})[0] == 409
+
+    status, view = call(api, 'POST', path + '/tiers/A/open')
+    assert status == 200 and view['active_tier'] == 'A' and view['pair'] is not None
+    status, view = call(api, 'POST', path + '/tiers/close')
+    assert status == 200 and view['active_tier'] is None and view['done']
+    assert call(api, 'POST', path + '/answer', {'picked_left': True})[0] == 409
+
+    status, result = call(api, 'GET', path + '/ranking')
+    assert status == 200 and {row['tier'] for row in result['ranking']} == {'A'}
+
+
+def test_topk_session(api):
+    view = start(api, pool_size=20, mode='topk', top_k=3)
+    assert view['mode'] == 'topk' and view['pair'] is not None
+
+
+@pytest.mark.parametrize('body', [
+    {'mode': 'bogus'},
+    {'pool_size': 1},
+    {'pool_size': '5'},
+    {'mode': 'topk', 'top_k': 0},
+    {'filters': ['Goose']},
+    {'filters': {'years': 'recent'}},
+    {'filters': {'artists': ['Nobody at all']}},
+])
+def test_bad_session_requests(api, body):
+    status, payload = call(api, 'POST', '/sessions', body)
+    assert status == 400 and payload['error']
+
+
+def test_request_errors(api):
+    assert api.dispatch('POST', '/sessions', b'{not json')[0] == 400
+    assert api.dispatch('POST', '/sessions', b'[1, 2]')[0] == 400
+    assert call(api, 'GET', '/sessions')[0] == 405
+    assert call(api, 'GET', '/share/decode')[0] == 405
+    assert call(api, 'POST', '/share/decode', {'code': 'not a code'})[0] == 400
+    assert call(api, 'GET', '/nowhere')[0] == 404
+    assert call(api, 'GET', '/sessions/unknown')[0] == 404
+
+    path = f"/sessions/{start(api)['session_id']}"
+    assert call(api, 'POST', path)[0] == 405
+    assert call(api, 'GET', path + '/answer')[0] == 405
+    assert call(api, 'POST', path + '/ranking')[0] == 405
+    assert call(api, 'POST', path + '/answer', {'picked_left': 'yes'})[0] == 400
+    assert call(api, 'POST', path + '/tiers/A/open')[0] == 400
+    assert call(api, 'POST', path + '/tiers/close')[0] == 400
+    assert call(api, 'POST', path + '/answer', {'tier': 'S'})[0] == 409
+    assert call(api, 'POST', path + '/frobnicate')[0] == 404
+
+
+def test_health(api):
+    start(api)
+    assert call(api, 'GET', '/health') == (200, {'ok': True, 'sessions': 1})
@@ -0,0 +1,93 @@
+"""Tests for the compiled binary catalog - round trip, freshness and corruption.
+
+Run with ``python -m pytest -q``.
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+import binary_catalog
+from catalog import load_catalog, load_song_index
+from pool_index import SongIndex, select_pool
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = str(tmp_path / 'songs.json')
+    shutil.copy('goose_songs.json', path)
+    return path
+
+
+def test_round_trip_matches_the_json(json_path):
+    binary_catalog.compile_catalog(json_path)
+    compiled = binary_catalog.open_catalog(json_path)
+    assert compiled is not None
+    with open(json_path) as f:
+        raw = json.load(f)['songs']
+    assert [compiled.song(i) for i in range(compiled.count)] == raw
+    compiled.close()
+
+    plain = SongIndex(load_catalog(json_path))
+    index = load_song_index(json_path)
+    assert not isinstance(index.songs, list)
+    assert list(index.songs) == plain.songs
+    for filters in ({}, {'origins': ['cover']}, {'years': (2018, 2020)}, {'min_plays': 10}):
+        assert select_pool(index, filters, limit=30) == select_pool(plain, filters, limit=30)
+
+
+def test_stale_binary_is_ignored(json_path):
+    with open(json_path) as f:
+        data = json.load(f)
+    with open(json_path, 'w') as f:
+        json.dump(data, f)
+    binary_catalog.compile_catalog(json_path)
+    stat = os.stat(json_path)
+
+    # Same size and mtime as when it was compiled - only the content changed
+    data['songs'].reverse()
+    with open(json_path, 'w') as f:
+        json.dump(data, f)
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.path.getsize(json_path) == stat.st_size
+    assert binary_catalog.open_catalog(json_path) is None
+
+
+def test_stale_binary_is_recompiled_on_load(json_path):
+    binary_catalog.compile_catalog(json_path)
+    with open(json_path) as f:
+        data = json.load(f)
+    data['songs'] = data['songs'][:10]
+    with open(json_path, 'w') as f:
+        json.dump(data, f)
+
+    index = load_song_index(json_path)
+    assert len(index.songs) == 10
+    compiled = binary_catalog.open_catalog(json_path)
+    assert compiled is not None and compiled.count == 10
+    compiled.close()
+
+
+def test_missing_binary_falls_back_to_json_when_read_only(json_path, monkeypatch):
+    monkeypatch.setattr(os, 'access', lambda path, mode: False)
+    index = load_song_index(json_path)
+    assert isinstance(index.songs, list) and index.songs == SongIndex(load_catalog(json_path)).songs
+    assert not os.path.exists(binary_catalog.binary_path_for(json_path))
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:binary_catalog.HEADER.size + 3],
+    lambda data: b'XXXX' + data[4:],
+    lambda data: b'',
+    lambda data: data[:binary_catalog.HEADER.size] + b'\xff' * (len(data) - binary_catalog.HEADER.size),
+])
+def test_corrupt_binary_is_ignored(json_path, damage):
+    path = binary_catalog.compile_catalog(json_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(damage(data))
+    assert binary_catalog.open_catalog(json_path) is None
@@ -0,0 +1,79 @@
+"""Tests for setlist ingestion and catalog refresh.
+
+Run with ``python -m pytest -q``.
+"""
+
+import json
+import os
+
+from catalog import load_catalog, refresh_catalog
+
+
+def performance(show_id: int, showdate: str, song: str, artist: str = 'Goose', tracktime: str = '8:00') -> dict:
+    return {'show_id': show_id, 'showdate': showdate, 'songname': song,
+            'original_artist': artist, 'tracktime': tracktime}
+
+
+def write_export(path, rows: list, wrapped: bool = True):
+    with open(path, 'w') as f:
+        json.dump({'error': False, 'data': rows} if wrapped else rows, f)
+
+
+def refresh(tmp_path, months: int = 12) -> dict:
+    return refresh_catalog(str(tmp_path / 'setlists'), str(tmp_path / 'songs.json'),
+                           str(tmp_path / 'cache.json'), months)
+
+
+def songs_by_name(tmp_path) -> dict:
+    return {s['name']: s for s in load_catalog(str(tmp_path / 'songs.json'))}
+
+
+def test_refresh_builds_catalog(tmp_path):
+    (tmp_path / 'setlists').mkdir()
+    write_export(tmp_path / 'setlists' / '2023.json', [
+        performance(1, '2023-01-10', 'Arcadia', tracktime='10:00'),
+        performance(1, '2023-01-10', 'Tumble', artist='Vasudo'),
+        performance(2, '2023-06-01', 'Arcadia', tracktime='12:00'),
+        performance(2, '2023-06-01', 'Shakedown Street', artist='Grateful Dead'),
+    ])
+    summary = refresh(tmp_path)
+    assert summary == {'files_read': 1, 'new_shows': 2, 'written': True}
+
+    songs = songs_by_name(tmp_path)
+    assert songs['Arcadia']['times_played'] == 2
+    assert songs['Arcadia']['first_played'] == '2023-01-10'
+    assert songs['Arcadia']['last_played'] == '2023-06-01'
+    assert songs['Arcadia']['avg_track_seconds'] == 660
+    assert songs['Tumble']['origin'] == 'side_project' and songs['Tumble']['category'] == 'original'
+    assert songs['Shakedown Street']['category'] == 'cover'
+    assert not os.path.exists(str(tmp_path / 'songs.json.tmp'))
+
+
+def test_refresh_skips_unchanged_files_and_seen_shows(tmp_path):
+    (tmp_path / 'setlists').mkdir()
+    write_export(tmp_path / 'setlists' / 'a.json', [performance(1, '2023-01-10', 'Arcadia')])
+    refresh(tmp_path)
+
+    assert refresh(tmp_path) == {'files_read': 0, 'new_shows': 0, 'written': False}
+
+    # A second export that repeats show 1 and adds show 2 (bare list form)
+    write_export(tmp_path / 'setlists' / 'b.json', [
+        performance(1, '2023-01-10', 'Arcadia'),
+        performance(2, '2023-02-01', 'Arcadia'),
+    ], wrapped=False)
+    assert refresh(tmp_path) == {'files_read': 1, 'new_shows': 1, 'written': True}
+    assert songs_by_name(tmp_path)['Arcadia']['times_played'] == 2
+
+
+def test_refresh_rebuilds_when_recent_window_changes(tmp_path):
+    (tmp_path / 'setlists').mkdir()
+    write_export(tmp_path / 'setlists' / 'a.json', [
+        performance(1, '2022-01-10', 'Arcadia'),
+        performance(2, '2023-12-01', 'Arcadia'),
+    ])
+    refresh(tmp_path, months=12)
+    assert songs_by_name(tmp_path)['Arcadia']['recent_plays'] == 1
+
+    summary = refresh(tmp_path, months=36)
+    assert summary['written'] and summary['new_shows'] == 0
+    assert songs_by_name(tmp_path)['Arcadia']['recent_plays'] == 2
@@ -0,0 +1,138 @@
+"""Tests for URL checkpoints - decode, validation and exact replay.
+
+Run with ``python -m pytest -q``.
+"""
+
+import base64
+import random
+
+import pytest
+
+import checkpoint
+import ranking
+from catalog import load_song_index
+from pool_index import select_pool
+
+
+@pytest.fixture(scope='module')
+def index():
+    return load_song_index('goose_songs.json')
+
+
+def comparable(state: dict) -> dict:
+    return {key: state[key] for key in ranking.STATE_KEYS}
+
+
+def random_session(index, rng: random.Random, mode: str, steps: int = 60):
+    """Drive a random session the way the app does, recording a checkpoint"""
+    pool = select_pool(index, {}, limit=rng.randint(2, 40))
+    top_k = rng.randint(1, len(pool)) if mode == 'topk' else None
+    state = ranking.new_state(pool, mode, top_k)
+    saved = checkpoint.new_checkpoint('fuzz', index, pool, mode, top_k)
+    history = []
+
+    for _ in range(steps):
+        actions = []
+        if ranking.current_pair(state) is not None:
+            actions.append('answer')
+        if mode != 'topk' and state['current_song'] and not state['active_tier']:
+            actions += ['skip', 'pick']
+        if mode == 'tiers':
+            if state['active_tier']:
+                actions.append('close')
+            else:
+                if state['current_song']:
+                    actions.append('assign')
+                if any(state['tiers'][t]['unsorted'] for t in ranking.TIERS):
+                    actions.append('open')
+        if history:
+            actions.append('undo')
+        if not actions:
+            break
+
+        action = rng.choice(actions)
+        if action == 'undo':
+            state, nbits = history.pop()
+            saved.truncate(nbits)
+            continue
+        history.append((state, saved.nbits))
+        if action == 'answer':
+            picked_left = rng.random() < 0.5
+            state = ranking.answer(state, picked_left)
+            saved.record_answer(picked_left)
+        elif action == 'skip':
+            state = ranking.skip_song(state)
+            saved.record_skip()
+        elif action == 'pick':
+            song = rng.choice(state['unranked_songs'])
+            saved.record_pick(checkpoint.pool_position(saved, index, song))
+            state = ranking.pick_song(state, song)
+        elif action == 'assign':
+            tier = rng.choice(ranking.TIERS)
+            state = ranking.assign_tier(state, tier)
+            saved.record_tier_command('assign', tier)
+        elif action == 'open':
+            tier = rng.choice([t for t in ranking.TIERS if state['tiers'][t]['unsorted']])
+            state = ranking.open_tier(state, tier)
+            saved.record_tier_command('open', tier)
+        else:
+            state = ranking.close_tier(state)
+            saved.record_tier_command('close')
+    return state, saved
+
+
+@pytest.mark.parametrize('mode', ['full', 'topk', 'tiers'])
+def test_checkpoint_replay_round_trips(index, mode):
+    rng = random.Random(mode)
+    for _ in range(200):
+        state, saved = random_session(index, rng, mode)
+        restored = checkpoint.replay(checkpoint.decode_checkpoint(saved.encode(), index), index)
+        assert comparable(restored) == comparable(state)
+
+
+def test_checkpoint_rejects_other_catalog(index):
+    pool = select_pool(index, {}, limit=10)
+    code = checkpoint.new_checkpoint('x', index, pool).encode()
+    other = load_song_index('goose_songs.json')
+    other.names = other.names[:-1]
+    with pytest.raises(ValueError):
+        checkpoint.decode_checkpoint(code, other)
+
+
+def test_checkpoint_rejects_topk_without_k(index):
+    pool = select_pool(index, {}, limit=10)
+    saved = checkpoint.new_checkpoint('x', index, pool, 'topk', 3)
+    saved.top_k = 0
+    with pytest.raises(ValueError):
+        checkpoint.decode_checkpoint(saved.encode(), index)
+
+
+@pytest.mark.parametrize('event', ['skip', 'pick'])
+def test_checkpoint_rejects_skip_and_pick_in_topk(index, event):
+    pool = select_pool(index, {}, limit=10)
+    saved = checkpoint.new_checkpoint('x', index, pool, 'topk', 3)
+    saved.record_skip() if event == 'skip' else saved.record_pick(2)
+    with pytest.raises(ValueError):
+        checkpoint.replay(checkpoint.decode_checkpoint(saved.encode(), index), index)
+
+
+def test_checkpoint_rejects_pool_bits_outside_the_catalog(index):
+    pool = select_pool(index, {}, limit=10)
+    saved = checkpoint.new_checkpoint('x', index, pool)
+    saved.pool_mask |= 1 << (8 * ((saved.catalog_size + 7) // 8) - 1)
+    with pytest.raises(ValueError):
+        checkpoint.decode_checkpoint(saved.encode(), index)
+
+
+def test_corrupted_checkpoints_only_raise_value_error(index):
+    rng = random.Random(0)
+    for _ in range(2000):
+        _, saved = random_session(index, rng, rng.choice(['full', 'topk', 'tiers']), steps=20)
+        raw = bytearray(base64.urlsafe_b64decode(saved.encode() + '=' * (-len(saved.encode()) % 4)))
+        for _ in range(rng.randint(1, 3)):
+            raw[rng.randrange(len(raw))] ^= 1 << rng.randrange(8)
+        code = base64.urlsafe_b64encode(bytes(raw)).decode().rstrip('=')
+        try:
+            checkpoint.replay(checkpoint.decode_checkpoint(code, index), index)
+        except ValueError:
+            pass
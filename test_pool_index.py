@@ -0,0 +1,77 @@
+"""Tests for the bitmap pool index against plain list filtering.
+
+Run with ``python -m pytest -q``.
+"""
+
+import random
+
+import pytest
+
+from catalog import load_catalog
+from pool_index import SongIndex, select_mask, select_pool, song_debut_year
+
+
+@pytest.fixture(scope='module')
+def songs():
+    return load_catalog('goose_songs.json')
+
+
+@pytest.fixture(scope='module')
+def index(songs):
+    return SongIndex(songs)
+
+
+def naive_pool(songs: list, filters: dict, include_covers: bool, limit: int = None) -> list:
+    origins = set(filters.get('origins') or ('original', 'side_project', 'cover'))
+    if not include_covers:
+        origins.discard('cover')
+    pool = [
+        s for s in sorted(songs, key=lambda s: s.get('times_played', 0), reverse=True)
+        if s['origin'] in origins
+        and (not filters.get('artists') or s['artist'] in filters['artists'])
+        and (not filters.get('years') or (song_debut_year(s) is not None
+                                          and filters['years'][0] <= song_debut_year(s) <= filters['years'][1]))
+        and s.get('times_played', 0) >= filters.get('min_plays', 0)
+    ]
+    return pool[:limit] if limit else pool
+
+
+def random_filters(rng: random.Random, index: SongIndex) -> dict:
+    first, last = index.year_range
+    lo = rng.randint(first, last)
+    return {
+        'artists': rng.sample(index.artists[:12], rng.randint(0, 3)),
+        'origins': rng.sample(['original', 'side_project', 'cover'], rng.randint(1, 3)),
+        'years': rng.choice([None, (lo, rng.randint(lo, last))]),
+        'min_plays': rng.choice([0, 0, 1, 5, 20, 100]),
+    }
+
+
+def test_select_pool_matches_naive_filtering(songs, index):
+    rng = random.Random(0)
+    for _ in range(500):
+        filters = random_filters(rng, index)
+        include_covers = rng.random() < 0.7
+        limit = rng.choice([None, 1, 10, 50, 1000])
+        expected = naive_pool(songs, filters, include_covers, limit)
+        assert select_pool(index, filters, include_covers, limit) == expected
+
+        mask = select_mask(index, filters, include_covers, limit)
+        assert mask.bit_count() == len(expected)
+        assert mask == index.mask_of(expected)
+
+
+def test_min_plays_is_a_prefix(songs, index):
+    for min_plays in (1, 10, 50, 10 ** 6):
+        pool = select_pool(index, {'min_plays': min_plays})
+        assert pool == index.songs[:len(pool)]
+        assert all(s['times_played'] >= min_plays for s in pool)
+        assert len(pool) == sum(1 for s in songs if s.get('times_played', 0) >= min_plays)
+
+
+def test_limit_keeps_the_most_played():
+    songs = [{'name': f"song {i}", 'artist': 'Goose', 'category': 'original', 'times_played': p}
+             for i, p in enumerate([5, 50, 5, 500, 0])]
+    index = SongIndex(songs)
+    assert [s['name'] for s in select_pool(index, {}, limit=3)] == ['song 3', 'song 1', 'song 0']
+    assert index.first(index.all_mask, 0) == 0
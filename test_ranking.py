@@ -0,0 +1,131 @@
+"""Tests for the ranking engine (full ranking, Top K and tier lists).
+
+Run with ``python -m pytest -q``.
+"""
+
+import random
+
+import pytest
+
+import ranking
+
+
+def make_pool(n: int) -> list:
+    return [{'name': f"song {i}", 'artist': 'Goose', 'category': 'original', 'times_played': n - i}
+            for i in range(n)]
+
+
+# Precomputed next states
+
+@pytest.mark.parametrize('mode', ['full', 'topk', 'tiers'])
+def test_precomputed_outcomes_match_answer(mode):
+    rng = random.Random(mode)
+    pool = make_pool(12)
+    state = ranking.new_state(pool, mode, 4 if mode == 'topk' else None)
+    checked = 0
+    for _ in range(200):
+        if mode == 'tiers' and not state['active_tier']:
+            if state['current_song']:
+                state = ranking.assign_tier(state, rng.choice('SA'))
+                continue
+            if not any(state['tiers'][t]['unsorted'] for t in 'SA'):
+                break
+            state = ranking.open_tier(state, rng.choice([t for t in 'SA' if state['tiers'][t]['unsorted']]))
+        if ranking.current_pair(state) is None:
+            break
+
+        outcomes = ranking.precompute_next_states(state, render=lambda pair: pair)
+        for picked_left in (True, False):
+            expected = ranking.answer(state, picked_left)
+            assert outcomes[picked_left]['state'] == expected
+            assert outcomes[picked_left]['pair'] == ranking.current_pair(expected)
+            assert outcomes[picked_left]['html'] == ranking.current_pair(expected)
+        checked += 1
+        state = outcomes[rng.random() < 0.5]['state']
+    assert checked > 5
+
+
+def test_nothing_to_precompute_when_done():
+    state = ranking.new_state(make_pool(2))
+    state = ranking.answer(state, True)
+    assert ranking.precompute_next_states(state) == {}
+
+
+# Pool edge cases
+
+def test_single_song_pool_is_already_ranked():
+    state = ranking.new_state(make_pool(1))
+    assert ranking.current_pair(state) is None
+    assert state['ranked_songs'] == make_pool(1)
+
+
+def test_single_song_tier_list_still_asks_for_a_tier():
+    state = ranking.new_state(make_pool(1), 'tiers')
+    assert state['current_song'] == make_pool(1)[0] and state['ranked_songs'] == []
+
+
+# Top K
+
+@pytest.mark.parametrize('size, k', [(25, 1), (25, 10), (40, 25), (8, 8)])
+def test_topk_finds_the_users_favorites(size, k):
+    rng = random.Random(size * k)
+    pool = make_pool(size)
+    for _ in range(10):
+        taste = {s['name']: rng.random() for s in pool}
+        _, found = ranking.simulate_comparisons(
+            pool, lambda a, b: taste[a['name']] > taste[b['name']], 'topk', k
+        )
+        assert found == sorted(pool, key=lambda s: taste[s['name']], reverse=True)[:k]
+
+
+def test_topk_for_nearly_the_whole_pool_ranks_everything():
+    pool = make_pool(10)
+    for k in (9, 10):
+        state = ranking.new_state(pool, 'topk', k)
+        assert state['ranking_mode'] == 'full'
+    assert ranking.new_state(pool, 'topk', 8)['ranking_mode'] == 'topk'
+
+
+@pytest.mark.parametrize('k', [None, 0, -3])
+def test_topk_needs_a_positive_k(k):
+    with pytest.raises(ValueError):
+        ranking.new_state(make_pool(10), 'topk', k)
+
+
+# Tier lists
+
+def test_tiers_sort_only_the_opened_tier():
+    pool = make_pool(10)
+    state = ranking.new_state(pool, 'tiers')
+    for tier in 'SSSSABBBBC':
+        state = ranking.assign_tier(state, tier)
+    assert ranking.current_pair(state) is None
+    placed = state['total_comparisons']
+
+    # Sort S with the last song placed there judged best
+    state = ranking.open_tier(state, 'S')
+    s_songs = set(s['name'] for s in pool[:4])
+    while ranking.current_pair(state) is not None:
+        left, right = ranking.current_pair(state)
+        assert {left['name'], right['name']} <= s_songs
+        state = ranking.answer(state, int(left['name'].split()[1]) > int(right['name'].split()[1]))
+
+    assert state['active_tier'] is None
+    assert [s['name'] for s in state['tiers']['S']['ranked']] == ['song 3', 'song 2', 'song 1', 'song 0']
+    # B was never opened, so it keeps its placement order
+    assert state['tiers']['B']['ranked'] == [] and len(state['tiers']['B']['unsorted']) == 4
+    assert [s['name'] for s in state['ranked_songs'][:5]] == ['song 3', 'song 2', 'song 1', 'song 0', 'song 4']
+    assert state['total_comparisons'] > placed
+
+
+def test_tier_sorting_can_pause_and_resume():
+    state = ranking.new_state(make_pool(6), 'tiers')
+    for _ in range(6):
+        state = ranking.assign_tier(state, 'A')
+    state = ranking.open_tier(state, 'A')
+    state = ranking.close_tier(ranking.answer(state, True))
+    assert state['active_tier'] is None and ranking.current_pair(state) is None
+    state = ranking.open_tier(state, 'A')
+    while ranking.current_pair(state) is not None:
+        state = ranking.answer(state, True)
+    assert len(state['tiers']['A']['ranked']) == 6
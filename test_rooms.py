@@ -0,0 +1,113 @@
+"""Tests for group ranking rooms - quorum, ties, sweeping and fan-out.
+
+Run with ``python -m pytest -q``.
+"""
+
+import threading
+
+import rooms
+
+
+def make_pool(n: int) -> list:
+    return [{'name': f"song {i}", 'artist': 'Goose', 'category': 'original', 'times_played': n - i}
+            for i in range(n)]
+
+
+def new_room(members: int, **options):
+    room = rooms.Room('TEST', 'test room', make_pool(6), **options)
+    return room, [room.join(f"member {i}") for i in range(members)]
+
+
+def test_room_advances_once_quorum_votes():
+    room, members = new_room(4, quorum=0.5)
+    assert room.vote(members[0], 0, True)
+    assert room.view.round == 0
+    assert room.vote(members[1], 0, True)
+    assert room.view.round == 1
+    assert room.view.last_result[:2] == ('song 0', 'song 1')
+
+
+def test_room_tie_waits_then_uses_first_vote():
+    room, members = new_room(3, quorum=0.5)
+    room.vote(members[0], 0, False)
+    room.vote(members[1], 0, True)
+    assert room.view.round == 0
+    room.vote(members[2], 0, True)
+    assert room.view.round == 1
+    assert room.view.last_result[0] == 'song 0'
+
+    room, members = new_room(2, quorum=1.0)
+    room.vote(members[0], 0, False)
+    room.vote(members[1], 0, True)
+    assert room.view.last_result[0] == 'song 1'
+
+
+def test_room_rejects_stale_votes():
+    room, members = new_room(2, quorum=0.5)
+    room.vote(members[0], 0, True)
+    assert room.view.round == 1
+    assert not room.vote(members[1], 0, False)
+    assert room.progress()[0] == 0
+
+
+def test_room_weighted_votes():
+    room = rooms.Room('TEST', 'test room', make_pool(6), voting='weighted', quorum=1.0)
+    host = room.join('host', weight=3)
+    others = [room.join('a'), room.join('b')]
+    for member in others:
+        room.vote(member, 0, False)
+    room.vote(host, 0, True)
+    assert room.view.last_result == ('song 0', 'song 1', 3, 2)
+
+
+def test_room_sweeps_idle_host():
+    room, (host, a, b) = new_room(3, quorum=0.5)
+    room.vote(a, 0, True)
+    room.vote(b, 0, False)
+    assert room.view.round == 0
+    room._members[host].last_seen -= rooms.MEMBER_TTL + 1
+    room._last_sweep -= rooms.SWEEP_INTERVAL
+    room.vote(a, 0, True)
+    assert room.host == a
+    assert room.view.round == 1
+
+
+def test_room_ranking_matches_unanimous_taste():
+    room, members = new_room(3, quorum=1.0)
+    while not room.view.done:
+        left, right = room.view.pair
+        for member in members:
+            room.vote(member, room.view.round, left['times_played'] > right['times_played'])
+    assert list(room.view.ranked) == make_pool(6)
+
+
+def test_room_render_matches_the_callers_view():
+    room, members = new_room(1, quorum=1.0)
+    view = room.view
+    room.vote(members[0], 0, True)
+    assert room.rendered(view, lambda v: v.pair) == view.pair
+    assert room.rendered(room.view, lambda v: v.pair) == room.view.pair
+
+
+def test_room_keeps_members_who_only_watch():
+    room, (host, watcher) = new_room(2, quorum=0.5)
+    for member in (host, watcher):
+        room._members[member].last_seen -= rooms.MEMBER_TTL + 1
+    assert room.touch(watcher)
+    assert room.sweep() == 1
+    assert room.members() == ['member 1']
+    assert not room.touch(host)
+
+
+def test_room_wakes_every_waiting_member():
+    room, members = new_room(20, quorum=0.5)
+    woken = []
+    waiters = [threading.Thread(target=lambda: woken.append(room.wait_for_round(0, timeout=5).round))
+               for _ in members]
+    for thread in waiters:
+        thread.start()
+    for member in members[:10]:
+        room.vote(member, 0, True)
+    for thread in waiters:
+        thread.join()
+    assert woken == [1] * len(members)